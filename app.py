@@ -20,6 +20,7 @@ from dashboard.data.loaders import (
     fetch_ics_events_for_range,
     load_custom_habit_done_by_date,
     load_custom_habit_done_by_date_cached,
+    load_day_snapshots_cached,
     load_data,
     load_data_for_email,
     load_data_for_email_cached,
@@ -69,7 +70,7 @@ from dashboard.constants import (
     DEFAULT_HABIT_LABELS,
     CUSTOMIZABLE_HABIT_KEYS,
     CUSTOM_HABITS_SETTING_KEY,
-    CUSTOM_HABIT_DONE_PREFIX,
+    CUSTOM_HABIT_DONE_TABLE,
     ENTRY_DATA_COLUMNS,
     ENTRY_COLUMNS,
     ENTRIES_TABLE,
@@ -298,6 +299,20 @@ def init_db():
                 """
             )
         )
+        conn.execute(
+            sql_text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {CUSTOM_HABIT_DONE_TABLE} (
+                    user_email TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    habit_id TEXT NOT NULL,
+                    done INTEGER DEFAULT 0,
+                    updated_at TEXT,
+                    PRIMARY KEY (user_email, date, habit_id)
+                )
+                """
+            )
+        )
         conn.execute(
             sql_text(
                 f"CREATE INDEX IF NOT EXISTS idx_{TASKS_TABLE}_user_scheduled "
@@ -837,38 +852,22 @@ def remove_custom_habit(habit_id):
 
 
 def get_custom_habit_done_for_date(entry_date):
-    if repositories.api_enabled():
-        return repositories.get_custom_habit_done(get_current_user_email(), entry_date)
-    raw = get_setting(f"{CUSTOM_HABIT_DONE_PREFIX}{entry_date.isoformat()}")
-    if not raw:
-        return {}
-    try:
-        payload = json.loads(raw)
-    except Exception:
-        return {}
-    if not isinstance(payload, dict):
-        return {}
+    done_map = repositories.get_custom_habit_done(get_current_user_email(), entry_date)
     return {
         str(habit_id): int(bool(value))
-        for habit_id, value in payload.items()
+        for habit_id, value in (done_map or {}).items()
         if sanitize_habit_name(habit_id)
     }
 
 
 def set_custom_habit_done_for_date(entry_date, habit_done_map):
-    if repositories.api_enabled():
-        repositories.set_custom_habit_done(get_current_user_email(), entry_date, habit_done_map)
-        return
     clean_map = {}
     for habit_id, value in (habit_done_map or {}).items():
         clean_id = sanitize_habit_name(habit_id)
         if not clean_id:
             continue
         clean_map[clean_id] = int(bool(value))
-    set_setting(
-        f"{CUSTOM_HABIT_DONE_PREFIX}{entry_date.isoformat()}",
-        json.dumps(clean_map, ensure_ascii=False),
-    )
+    repositories.set_custom_habit_done(get_current_user_email(), entry_date, clean_map)
 
 
 def _default_entries_range(window_days: int = 365):
@@ -907,10 +906,12 @@ def load_custom_habits_into_state(entry_date, custom_habits, custom_done_by_date
 
 def invalidate_entries_cache():
     load_data_for_email_cached.clear()
+    load_day_snapshots_cached.clear()
 
 
 def invalidate_habits_cache():
     load_custom_habit_done_by_date_cached.clear()
+    load_day_snapshots_cached.clear()
 
 
 def invalidate_tasks_cache():
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+BREAKER_MAX_RESET_SECONDS = 300.0
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fail fast while an upstream is down.
+
+    closed: calls go through and consecutive failures are counted.
+    open: calls raise CircuitOpenError until the reset window passes.
+    half_open: one probe call goes through; success closes the breaker, failure reopens it
+    with a doubled window.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = BREAKER_RESET_SECONDS,
+        max_reset_seconds: float = BREAKER_MAX_RESET_SECONDS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_reset_seconds = max_reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._open_for = reset_seconds
+        self._probe_in_flight = False
+        self._last_error: str | None = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self._open_for:
+            return "half_open"
+        return "open"
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed; 0 when calls may go through."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self._open_for - time.monotonic())
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        raise CircuitOpenError(self.name, self.retry_after() or 1.0)
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("%s circuit closed after successful probe.", self.name)
+        self._failures = 0
+        self._opened_at = None
+        self._open_for = self.reset_seconds
+        self._probe_in_flight = False
+        self._last_error = None
+
+    def record_failure(self, error: str) -> None:
+        self._last_error = error
+        if self._probe_in_flight:
+            self._probe_in_flight = False
+            self._open_for = min(self.max_reset_seconds, self._open_for * 2)
+            self._opened_at = time.monotonic()
+            logger.warning("%s probe failed; circuit open for %.0fs: %s", self.name, self._open_for, error)
+            return
+        self._failures += 1
+        if self._opened_at is None and self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            logger.warning("%s circuit open after %d failures: %s", self.name, self._failures, error)
+
+    def release_probe(self) -> None:
+        """Let another caller probe when this one ended without a verdict (e.g. cancelled)."""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_after": round(self.retry_after(), 1),
+            "last_error": self._last_error,
+        }
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import logging
+from typing import AsyncIterator
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 
 from backend.settings import get_settings
 
@@ -71,3 +72,13 @@ def get_sessionmaker() -> async_sessionmaker:
     if _session_factory is None:
         _session_factory = async_sessionmaker(get_engine(), expire_on_commit=False)
     return _session_factory
+
+
+async def get_request_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one session and transaction per request.
+
+    Handlers commit it themselves before returning. Dependency teardown runs after the response
+    is sent, so a commit there could fail behind a 200. Anything left uncommitted is rolled back.
+    """
+    async with get_sessionmaker()() as session:
+        yield session
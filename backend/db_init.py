@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from sqlalchemy import text as sql_text
+import json
+import logging
+
+from sqlalchemy import bindparam, text as sql_text
 
 from backend.db import get_engine
 
+logger = logging.getLogger(__name__)
+
 
 ENTRIES_TABLE = "daily_entries_user"
 TASKS_TABLE = "todo_tasks"
@@ -15,6 +20,15 @@ SYNC_CURSOR_TABLE = "google_sync_cursor"
 SYNC_OUTBOX_TABLE = "sync_outbox"
 SHARED_STREAK_CACHE_TABLE = "shared_streak_cache"
 DAY_SNAPSHOT_CACHE_TABLE = "day_snapshot_cache"
+CUSTOM_HABIT_DONE_TABLE = "custom_habit_done"
+SYNC_JOBS_TABLE = "sync_jobs"
+GOOGLE_QUOTA_TABLE = "google_api_quota"
+
+# v2 re-copies blobs the Streamlit/web direct-DB paths kept writing after the first copy, before they
+# moved to the table.
+CUSTOM_HABIT_DONE_MIGRATION_KEY = "migrations::custom_habit_done_table:v2"
+# v2 runs again where the first marker was written but the unique index never got built.
+GOOGLE_EVENT_DEDUPE_MIGRATION_KEY = "migrations::todo_tasks_google_event_dedupe:v2"
 
 
 async def init_db():
@@ -81,6 +95,7 @@ async def init_db():
                     is_done INTEGER DEFAULT 0,
                     google_calendar_id TEXT,
                     google_event_id TEXT,
+                    google_etag TEXT,
                     created_at TEXT NOT NULL,
                     updated_at TEXT
                 )
@@ -128,11 +143,47 @@ async def init_db():
                     sync_token TEXT,
                     last_synced_at TEXT,
                     last_error TEXT,
+                    page_token TEXT,
+                    window_min TEXT,
+                    window_max TEXT,
+                    calendar_timezone TEXT,
+                    timezone_fetched_at TEXT,
                     PRIMARY KEY (user_email, calendar_id)
                 )
                 """
             )
         )
+        await conn.execute(
+            sql_text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {GOOGLE_QUOTA_TABLE} (
+                    user_email TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    request_count INTEGER DEFAULT 0,
+                    updated_at TEXT,
+                    PRIMARY KEY (user_email, day)
+                )
+                """
+            )
+        )
+        await conn.execute(
+            sql_text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {SYNC_JOBS_TABLE} (
+                    id TEXT PRIMARY KEY,
+                    user_email TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress_json TEXT,
+                    result_json TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    finished_at TEXT
+                )
+                """
+            )
+        )
         await conn.execute(
             sql_text(
                 f"""
@@ -147,6 +198,8 @@ async def init_db():
                     attempts INTEGER DEFAULT 0,
                     next_retry_at TEXT,
                     last_error TEXT,
+                    claimed_by TEXT,
+                    lease_expires_at TEXT,
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL
                 )
@@ -161,6 +214,7 @@ async def init_db():
                     habit_key TEXT NOT NULL,
                     user_email TEXT NOT NULL,
                     streak_days INTEGER DEFAULT 0,
+                    last_done_date TEXT,
                     updated_at TEXT,
                     PRIMARY KEY (couple_key, habit_key, user_email)
                 )
@@ -183,6 +237,20 @@ async def init_db():
                 """
             )
         )
+        await conn.execute(
+            sql_text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {CUSTOM_HABIT_DONE_TABLE} (
+                    user_email TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    habit_id TEXT NOT NULL,
+                    done INTEGER DEFAULT 0,
+                    updated_at TEXT,
+                    PRIMARY KEY (user_email, date, habit_id)
+                )
+                """
+            )
+        )
 
     async def ensure_column(table_name: str, column_name: str, column_ddl: str) -> None:
         try:
@@ -202,18 +270,47 @@ async def init_db():
 
     await ensure_column(TASKS_TABLE, "version", "INTEGER DEFAULT 1")
     await ensure_column(TASKS_TABLE, "updated_at", "TEXT")
+    await ensure_column(TASKS_TABLE, "google_etag", "TEXT")
     await ensure_column(SUBTASKS_TABLE, "version", "INTEGER DEFAULT 1")
     await ensure_column(SUBTASKS_TABLE, "updated_at", "TEXT")
     await ensure_column(ENTRIES_TABLE, "daily_text", "INTEGER DEFAULT 0")
     await ensure_column(ENTRIES_TABLE, "family_worship", "INTEGER DEFAULT 0")
+    await ensure_column(SHARED_STREAK_CACHE_TABLE, "last_done_date", "TEXT")
+    await ensure_column(SYNC_OUTBOX_TABLE, "claimed_by", "TEXT")
+    await ensure_column(SYNC_OUTBOX_TABLE, "lease_expires_at", "TEXT")
+    await ensure_column(SYNC_CURSOR_TABLE, "page_token", "TEXT")
+    await ensure_column(SYNC_CURSOR_TABLE, "window_min", "TEXT")
+    await ensure_column(SYNC_CURSOR_TABLE, "window_max", "TEXT")
+    await ensure_column(SYNC_CURSOR_TABLE, "calendar_timezone", "TEXT")
+    await ensure_column(SYNC_CURSOR_TABLE, "timezone_fetched_at", "TEXT")
 
+    await ensure_index(
+        f"CREATE INDEX IF NOT EXISTS idx_{ENTRIES_TABLE}_user_updated "
+        f"ON {ENTRIES_TABLE} (user_email, updated_at)"
+    )
     await ensure_index(
         f"CREATE INDEX IF NOT EXISTS idx_{TASKS_TABLE}_user_date_updated "
         f"ON {TASKS_TABLE} (user_email, scheduled_date, updated_at)"
     )
+    # Only pending/processing rows are ever claimed; done and dead rows stay out of the hot index.
+    await ensure_index(
+        f"CREATE INDEX IF NOT EXISTS idx_{SYNC_OUTBOX_TABLE}_actionable "
+        f"ON {SYNC_OUTBOX_TABLE} (user_email, status, next_retry_at) "
+        "WHERE status IN ('pending', 'processing')"
+    )
+    await ensure_index(
+        f"CREATE INDEX IF NOT EXISTS idx_{SYNC_OUTBOX_TABLE}_entity "
+        f"ON {SYNC_OUTBOX_TABLE} (user_email, entity_type, entity_id, created_at) "
+        "WHERE status IN ('pending', 'processing')"
+    )
+    await ensure_index(f"DROP INDEX IF EXISTS idx_{SYNC_OUTBOX_TABLE}_status")
     await ensure_index(
-        f"CREATE INDEX IF NOT EXISTS idx_{SYNC_OUTBOX_TABLE}_status "
-        f"ON {SYNC_OUTBOX_TABLE} (user_email, status, next_retry_at)"
+        f"CREATE INDEX IF NOT EXISTS idx_{SYNC_OUTBOX_TABLE}_lease "
+        f"ON {SYNC_OUTBOX_TABLE} (status, lease_expires_at)"
+    )
+    await ensure_index(
+        f"CREATE INDEX IF NOT EXISTS idx_{SYNC_JOBS_TABLE}_user "
+        f"ON {SYNC_JOBS_TABLE} (user_email, created_at)"
     )
     await ensure_index(
         f"CREATE INDEX IF NOT EXISTS idx_{SYNC_CURSOR_TABLE}_user "
@@ -223,6 +320,7 @@ async def init_db():
         f"CREATE INDEX IF NOT EXISTS idx_{TASKS_TABLE}_google_lookup "
         f"ON {TASKS_TABLE} (user_email, google_calendar_id, google_event_id)"
     )
+    await _dedupe_google_event_tasks(engine)
     await ensure_index(
         f"CREATE INDEX IF NOT EXISTS idx_{DAY_SNAPSHOT_CACHE_TABLE}_user_date "
         f"ON {DAY_SNAPSHOT_CACHE_TABLE} (user_email, date)"
@@ -234,3 +332,158 @@ async def init_db():
         f"CREATE INDEX IF NOT EXISTS idx_{SUBTASKS_TABLE}_task_id "
         f"ON {SUBTASKS_TABLE} (user_email, task_id)"
     )
+    await ensure_index(
+        f"CREATE INDEX IF NOT EXISTS idx_{CUSTOM_HABIT_DONE_TABLE}_user_date "
+        f"ON {CUSTOM_HABIT_DONE_TABLE} (user_email, date)"
+    )
+
+    await _migrate_custom_habit_done(engine)
+
+
+def _dedupe_survivor_rank(row) -> tuple:
+    # Keep the copy the user actually worked on: one with subtasks, then a manual/edited task over the
+    # imported one, then the most recently updated.
+    return (
+        int(row["subtask_count"] or 0) > 0,
+        row["source"] != "google",
+        str(row["updated_at"] or row["created_at"] or ""),
+        str(row["id"]),
+    )
+
+
+async def _dedupe_google_event_tasks(engine) -> None:
+    """Older syncs could insert the same Google event twice; keep one row per event and put the
+    unique index upsert_google_tasks' ON CONFLICT relies on in place, in one transaction.
+
+    Subtasks of the dropped copies move to the survivor. The marker is written only once the index
+    exists, so a failed attempt is retried on the next start.
+    """
+    try:
+        await _dedupe_google_event_tasks_once(engine)
+    except Exception:
+        logger.exception(
+            "Google event dedupe or uq_%s_google_event creation failed; calendar sync upserts will fail "
+            "until it succeeds on a later start.",
+            TASKS_TABLE,
+        )
+
+
+async def _dedupe_google_event_tasks_once(engine) -> None:
+    async with engine.begin() as conn:
+        marker = (await conn.execute(
+            sql_text(f"SELECT value FROM {SETTINGS_TABLE} WHERE key = :key"),
+            {"key": GOOGLE_EVENT_DEDUPE_MIGRATION_KEY},
+        )).fetchone()
+        if marker:
+            return
+        if conn.dialect.name == "postgresql":
+            # Hold off concurrent writers (an old instance still syncing) until the index is built.
+            await conn.execute(sql_text(f"LOCK TABLE {TASKS_TABLE} IN SHARE MODE"))
+        rows = (await conn.execute(
+            sql_text(
+                f"""
+                SELECT t.id, t.user_email, t.google_calendar_id, t.google_event_id, t.source,
+                       t.created_at, t.updated_at,
+                       (SELECT COUNT(*) FROM {SUBTASKS_TABLE} s WHERE s.task_id = t.id) AS subtask_count
+                FROM {TASKS_TABLE} t
+                JOIN (
+                    SELECT user_email, google_calendar_id, google_event_id
+                    FROM {TASKS_TABLE}
+                    WHERE google_event_id IS NOT NULL AND google_calendar_id IS NOT NULL
+                    GROUP BY user_email, google_calendar_id, google_event_id
+                    HAVING COUNT(*) > 1
+                ) d
+                  ON d.user_email = t.user_email
+                 AND d.google_calendar_id = t.google_calendar_id
+                 AND d.google_event_id = t.google_event_id
+                """
+            )
+        )).mappings().all()
+        groups: dict[tuple, list] = {}
+        for row in rows:
+            groups.setdefault((row["user_email"], row["google_calendar_id"], row["google_event_id"]), []).append(row)
+        removed = 0
+        for group in groups.values():
+            survivor, *duplicates = sorted(group, key=_dedupe_survivor_rank, reverse=True)
+            duplicate_ids = [row["id"] for row in duplicates]
+            await conn.execute(
+                sql_text(
+                    f"UPDATE {SUBTASKS_TABLE} SET task_id = :survivor_id WHERE task_id IN :duplicate_ids"
+                ).bindparams(bindparam("duplicate_ids", expanding=True)),
+                {"survivor_id": survivor["id"], "duplicate_ids": duplicate_ids},
+            )
+            await conn.execute(
+                sql_text(f"DELETE FROM {TASKS_TABLE} WHERE id IN :duplicate_ids").bindparams(
+                    bindparam("duplicate_ids", expanding=True)
+                ),
+                {"duplicate_ids": duplicate_ids},
+            )
+            removed += len(duplicate_ids)
+        if removed:
+            logger.warning("Removed %d duplicate Google event tasks across %d events.", removed, len(groups))
+        await conn.execute(
+            sql_text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{TASKS_TABLE}_google_event "
+                f"ON {TASKS_TABLE} (user_email, google_calendar_id, google_event_id)"
+            )
+        )
+        await conn.execute(
+            sql_text(
+                f"INSERT INTO {SETTINGS_TABLE} (key, value) VALUES (:key, :value) ON CONFLICT(key) DO NOTHING"
+            ),
+            {"key": GOOGLE_EVENT_DEDUPE_MIGRATION_KEY, "value": str(removed)},
+        )
+
+
+async def _migrate_custom_habit_done(engine) -> None:
+    """Copy legacy `<email>::custom_habit_done::<date>` settings blobs into the normalized table once.
+
+    Rows already written through the table (updated_at set) win over the blobs.
+    """
+    async with engine.begin() as conn:
+        marker = (await conn.execute(
+            sql_text(f"SELECT value FROM {SETTINGS_TABLE} WHERE key = :key"),
+            {"key": CUSTOM_HABIT_DONE_MIGRATION_KEY},
+        )).fetchone()
+        if marker:
+            return
+        rows = (await conn.execute(
+            sql_text(f"SELECT key, value FROM {SETTINGS_TABLE} WHERE key LIKE :pattern"),
+            {"pattern": "%::custom_habit_done::%"},
+        )).fetchall()
+        records = []
+        for key, value in rows:
+            user_email, _, date_part = str(key or "").partition("::custom_habit_done::")
+            if not user_email or not date_part:
+                continue
+            try:
+                decoded = json.loads(value or "{}")
+            except Exception:
+                continue
+            if not isinstance(decoded, dict):
+                continue
+            for habit_id, done in decoded.items():
+                records.append(
+                    {
+                        "user_email": user_email,
+                        "date": date_part,
+                        "habit_id": str(habit_id),
+                        "done": int(bool(done)),
+                    }
+                )
+        if records:
+            await conn.execute(
+                sql_text(
+                    f"""
+                    INSERT INTO {CUSTOM_HABIT_DONE_TABLE} (user_email, date, habit_id, done, updated_at)
+                    VALUES (:user_email, :date, :habit_id, :done, NULL)
+                    ON CONFLICT(user_email, date, habit_id) DO UPDATE SET done = EXCLUDED.done
+                    WHERE {CUSTOM_HABIT_DONE_TABLE}.updated_at IS NULL
+                    """
+                ),
+                records,
+            )
+        await conn.execute(
+            sql_text(f"INSERT INTO {SETTINGS_TABLE} (key, value) VALUES (:key, :value)"),
+            {"key": CUSTOM_HABIT_DONE_MIGRATION_KEY, "value": str(len(records))},
+        )
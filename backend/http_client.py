@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_HTTP_TIMEOUT = httpx.Timeout(10.0, connect=5.0, pool=5.0)
+GOOGLE_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled client for Google APIs; connections are reused across calls."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        # A client is bound to the loop that opened its connections; never share one across loops.
+        http2 = _http2_available()
+        if not http2:
+            logger.info("h2 not installed; Google HTTP client falls back to HTTP/1.1 keep-alive.")
+        _client = httpx.AsyncClient(
+            http2=http2,
+            timeout=GOOGLE_HTTP_TIMEOUT,
+            limits=GOOGLE_HTTP_LIMITS,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    client = _client
+    _client = None
+    _client_loop = None
+    if client is not None and not client.is_closed:
+        await client.aclose()
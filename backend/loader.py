@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable
+
+# Each repository call checks out its own pooled connection, so this also bounds
+# how much of the pool (pool_size=20, max_overflow=10) a single request can hold.
+DEFAULT_FANOUT_LIMIT = 4
+
+
+async def load_concurrently(limit: int = DEFAULT_FANOUT_LIMIT, **calls: Awaitable[Any]) -> dict[str, Any]:
+    """Await independent reads in parallel and return their results keyed by name."""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _run(awaitable: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await awaitable
+
+    tasks = {name: asyncio.ensure_future(_run(awaitable)) for name, awaitable in calls.items()}
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return {name: task.result() for name, task in tasks.items()}
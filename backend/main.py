@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 
@@ -7,8 +8,16 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.circuit_breaker import CircuitOpenError
 from backend.db_init import init_db
-from backend.routes import bootstrap, day, habits, tasks, calendar, sync, oauth, couple, entries, settings, header
+from backend import repositories
+from backend.http_client import close_http_client
+from backend.outbox_notify import listen_for_settings
+from backend.services import google_calendar_service
+from backend.services.sync_jobs import reconcile_sync_jobs, shutdown_sync_jobs
+from backend.settings import get_settings
+from backend.workers import sync_worker
+from backend.routes import bootstrap, day, habits, tasks, calendar, sync, oauth, couple, entries, settings, header, stats
 
 
 def create_app() -> FastAPI:
@@ -36,10 +45,37 @@ def create_app() -> FastAPI:
     app.include_router(entries.router)
     app.include_router(settings.router)
     app.include_router(header.router)
+    app.include_router(stats.router)
 
     @app.on_event("startup")
     async def _startup():
         await init_db()
+        await reconcile_sync_jobs()
+        # Other API instances and the worker announce settings writes; drop our cached copy on each.
+        app.state.settings_listener = asyncio.create_task(
+            listen_for_settings(repositories.invalidate_user_settings_cache)
+        )
+        if get_settings().embedded_outbox_worker:
+            sync_worker.start_embedded_worker()
+
+    @app.on_event("shutdown")
+    async def _shutdown():
+        settings_listener = getattr(app.state, "settings_listener", None)
+        if settings_listener is not None:
+            settings_listener.cancel()
+            await asyncio.gather(settings_listener, return_exceptions=True)
+        await sync_worker.stop_embedded_worker()
+        await shutdown_sync_jobs()
+        await google_calendar_service.flush_quota_usage()
+        await close_http_client()
+
+    @app.exception_handler(CircuitOpenError)
+    async def _circuit_open_handler(request: Request, exc: CircuitOpenError):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(max(1, int(exc.retry_after)))},
+        )
 
     @app.exception_handler(Exception)
     async def _unhandled_exception_handler(request: Request, exc: Exception):
@@ -48,7 +84,7 @@ def create_app() -> FastAPI:
 
     @app.get("/health")
     async def health():
-        return {"ok": True}
+        return {"ok": True, "circuit_breakers": google_calendar_service.breaker_states()}
 
     return app
 
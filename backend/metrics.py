@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import date
+
+FIXED_COUPLE_HABIT_KEYS = [
+    "bible_reading",
+    "workout",
+    "shower",
+    "daily_text",
+    "meeting_attended",
+    "prepare_meeting",
+    "family_worship",
+]
+MEETING_HABIT_KEYS = {"meeting_attended", "prepare_meeting"}
+FAMILY_WORSHIP_HABIT_KEYS = {"family_worship"}
+
+
+def compute_balance_score(row: dict) -> float:
+    habits_percent = row.get("habits_percent", 0) or 0
+    work_hours = row.get("work_hours", 0) or 0
+    sleep_hours = row.get("sleep_hours", 0) or 0
+    boredom = row.get("boredom_minutes", 60) or 60
+
+    work_score = min(work_hours, 8) / 8 * 100
+    sleep_score = min(sleep_hours, 8) / 8 * 100
+    if 10 <= boredom <= 40:
+        boredom_score = 100
+    elif boredom < 10:
+        boredom_score = max(0, (boredom / 10) * 100)
+    else:
+        boredom_score = max(0, ((60 - boredom) / 20) * 100)
+
+    score = (
+        habits_percent * 0.35
+        + work_score * 0.25
+        + sleep_score * 0.25
+        + boredom_score * 0.15
+    )
+    return round(score, 1)
+
+
+def compute_habits_metrics(
+    row: dict,
+    day: date,
+    meeting_days,
+    family_worship_day: int,
+    custom_done: dict,
+    custom_habit_ids: list[str],
+) -> tuple[int, float, int]:
+    total = 0
+    completed = 0
+    weekday = day.weekday()
+    for key in FIXED_COUPLE_HABIT_KEYS:
+        if key in MEETING_HABIT_KEYS and weekday not in meeting_days:
+            continue
+        if key in FAMILY_WORSHIP_HABIT_KEYS and weekday != family_worship_day:
+            continue
+        total += 1
+        completed += int(row.get(key, 0) or 0)
+
+    for habit_id in custom_habit_ids:
+        total += 1
+        completed += int(bool((custom_done or {}).get(habit_id, 0)))
+
+    priority_label = (row.get("priority_label") or "").strip()
+    if priority_label:
+        total += 1
+        completed += int(row.get("priority_done", 0) or 0)
+    percent = round((completed / total) * 100, 1) if total > 0 else 0
+    return completed, percent, total
+
+
+def compute_day_snapshot(
+    row: dict,
+    day: date,
+    meeting_days,
+    family_worship_day: int,
+    custom_done: dict,
+    custom_habit_ids: list[str],
+) -> dict:
+    completed, percent, total = compute_habits_metrics(
+        row, day, meeting_days, family_worship_day, custom_done, custom_habit_ids
+    )
+    return {
+        "date": day.isoformat(),
+        "habits_completed": completed,
+        "habits_total": total,
+        "habits_percent": percent,
+        "life_balance_score": compute_balance_score({**row, "habits_percent": percent}),
+    }
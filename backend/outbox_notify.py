@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable
+
+from sqlalchemy import event, text as sql_text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_CHANNEL = "sync_outbox"
+SETTINGS_CHANNEL = "user_settings"
+LISTENER_HEALTHCHECK_SECONDS = 30
+LISTENER_RETRY_SECONDS = 5
+
+_wakeup: asyncio.Event | None = None
+
+
+def get_outbox_wakeup() -> asyncio.Event:
+    """In-process signal set whenever outbox work is committed or a NOTIFY arrives."""
+    global _wakeup
+    if _wakeup is None:
+        _wakeup = asyncio.Event()
+    return _wakeup
+
+
+def _is_postgres() -> bool:
+    return get_engine().dialect.name == "postgresql"
+
+
+def _wake_after_commit(_session) -> None:
+    get_outbox_wakeup().set()
+
+
+async def notify_outbox(session: AsyncSession, user_email: str) -> None:
+    """Signal pending outbox work once the surrounding transaction commits."""
+    if _is_postgres():
+        # NOTIFY is transactional: listeners only hear it after COMMIT.
+        await session.execute(
+            sql_text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": OUTBOX_CHANNEL, "payload": user_email},
+        )
+    sync_session = session.sync_session
+    if not event.contains(sync_session, "after_commit", _wake_after_commit):
+        event.listen(sync_session, "after_commit", _wake_after_commit, once=True)
+
+
+async def notify_settings_changed(session: AsyncSession, user_email: str) -> None:
+    """Tell other processes to drop their cached settings for this user once the write commits."""
+    if _is_postgres():
+        await session.execute(
+            sql_text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": SETTINGS_CHANNEL, "payload": user_email},
+        )
+
+
+async def _listen(handlers: dict[str, Callable[[str], None]], on_connect: Callable[[], None]) -> None:
+    """Hold a dedicated LISTEN connection on Postgres, reconnecting on failure.
+
+    on_connect runs after every (re)connect, since anything sent while disconnected was missed.
+    """
+    if not _is_postgres():
+        return
+
+    def _dispatch(_connection, _pid, channel, payload) -> None:
+        handlers[channel](payload)
+
+    while True:
+        try:
+            async with get_engine().connect() as conn:
+                raw = await conn.get_raw_connection()
+                driver = raw.driver_connection
+                for channel in handlers:
+                    await driver.add_listener(channel, _dispatch)
+                on_connect()
+                try:
+                    while True:
+                        await asyncio.sleep(LISTENER_HEALTHCHECK_SECONDS)
+                        await driver.execute("SELECT 1")
+                finally:
+                    if not driver.is_closed():
+                        for channel in handlers:
+                            await driver.remove_listener(channel, _dispatch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("LISTEN connection lost, retrying: %s", exc)
+        await asyncio.sleep(LISTENER_RETRY_SECONDS)
+
+
+async def listen_for_outbox(wakeup: asyncio.Event) -> None:
+    """Set `wakeup` on every outbox NOTIFY."""
+    await _listen({OUTBOX_CHANNEL: lambda _payload: wakeup.set()}, wakeup.set)
+
+
+async def listen_for_settings(on_change: Callable[[str | None], None]) -> None:
+    """Call on_change(user_email) for every settings NOTIFY, and on_change(None) after a reconnect."""
+    await _listen({SETTINGS_CHANNEL: on_change}, lambda: on_change(None))
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import json
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from uuid import uuid4
 
 from sqlalchemy import text as sql_text, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.db import get_sessionmaker
+from backend.db import get_engine, get_sessionmaker
+from backend.loader import load_concurrently
+from backend.metrics import FAMILY_WORSHIP_HABIT_KEYS, MEETING_HABIT_KEYS, compute_day_snapshot
+from backend.outbox_notify import notify_outbox, notify_settings_changed
 from backend.settings import get_settings
 
 ENTRIES_TABLE = "daily_entries_user"
@@ -15,7 +22,12 @@ TASKS_TABLE = "todo_tasks"
 SUBTASKS_TABLE = "todo_subtasks"
 GOOGLE_TOKENS_TABLE = "google_calendar_tokens"
 SYNC_OUTBOX_TABLE = "sync_outbox"
+SYNC_JOBS_TABLE = "sync_jobs"
+GOOGLE_QUOTA_TABLE = "google_api_quota"
 SYNC_CURSOR_TABLE = "google_sync_cursor"
+SHARED_STREAK_CACHE_TABLE = "shared_streak_cache"
+DAY_SNAPSHOT_CACHE_TABLE = "day_snapshot_cache"
+CUSTOM_HABIT_DONE_TABLE = "custom_habit_done"
 
 HABIT_KEYS = [
     "bible_reading",
@@ -32,6 +44,18 @@ HABIT_KEYS = [
     "scientific_writing",
 ]
 
+STREAK_LOOKBACK_DAYS = 400
+GOOGLE_UPSERT_CHUNK_SIZE = 100
+OUTBOX_LEASE_SECONDS = 300
+OUTBOX_MAX_ATTEMPTS = 8
+# Task columns that end up in the Google event built by the sync worker.
+GOOGLE_EVENT_TASK_FIELDS = {"title", "scheduled_date", "scheduled_time", "estimated_minutes"}
+
+USER_SETTINGS_KEYS = ("meeting_days", "family_worship_day", "custom_habits")
+USER_SETTINGS_CACHE_TTL_SECONDS = 30
+DEFAULT_MEETING_DAYS = [1, 3]
+DEFAULT_FAMILY_WORSHIP_DAY = 6
+
 ENTRY_SELECT_COLUMNS = [
     "user_email",
     "date",
@@ -54,6 +78,22 @@ def _new_id() -> str:
     return uuid4().hex
 
 
+def _is_postgres() -> bool:
+    return get_engine().dialect.name == "postgresql"
+
+
+@asynccontextmanager
+async def _session_scope(session: AsyncSession | None = None):
+    """Reuse the caller's session without committing, or open and commit a private one."""
+    if session is not None:
+        yield session
+        return
+    session_factory = get_sessionmaker()
+    async with session_factory() as own_session:
+        yield own_session
+        await own_session.commit()
+
+
 def _normalize_time_value(value):
     if value is None:
         return None
@@ -167,6 +207,8 @@ async def patch_day_entry(user_email: str, day_iso: str, patch: dict) -> None:
     payload_info = _entry_patch_payload(user_email, day_iso, normalized)
     session_factory = get_sessionmaker()
     async with session_factory() as session:
+        # Taken before the write: cache rows at least this new saw every earlier entry write.
+        entries_watermark = await _entries_watermark(session, user_email)
         await session.execute(
             sql_text(
                 f"""
@@ -177,9 +219,103 @@ async def patch_day_entry(user_email: str, day_iso: str, patch: dict) -> None:
             ),
             payload_info["payload"],
         )
+        habit_patch = {key: normalized[key] for key in HABIT_KEYS if key in normalized}
+        if habit_patch:
+            await _apply_streak_patch(session, user_email, day_iso, habit_patch, entries_watermark)
+        await _refresh_day_snapshots(session, user_email, day_iso, day_iso)
         await session.commit()
 
 
+@dataclass
+class UserSettings:
+    user_email: str
+    meeting_days: list[int] = field(default_factory=lambda: list(DEFAULT_MEETING_DAYS))
+    family_worship_day: int = DEFAULT_FAMILY_WORSHIP_DAY
+    custom_habits: list[dict] = field(default_factory=list)
+
+    @classmethod
+    def from_raw(cls, user_email: str, raw: dict) -> "UserSettings":
+        return cls(
+            user_email=user_email,
+            meeting_days=_parse_meeting_days(raw.get("meeting_days")),
+            family_worship_day=_parse_family_worship_day(raw.get("family_worship_day")),
+            custom_habits=_parse_custom_habits(raw.get("custom_habits")),
+        )
+
+
+# user_email -> (loaded_at, {setting key: raw value}); kept current by set_setting here and by
+# settings NOTIFYs from other processes (Postgres), with the TTL as the bound everywhere else.
+_USER_SETTINGS_CACHE: dict[str, tuple[float, dict]] = {}
+# Bumped on every write/invalidation; a load that started under an older generation is not cached.
+_USER_SETTINGS_GENERATION: dict[str, int] = {}
+
+
+def _parse_meeting_days(raw: str | None) -> list[int]:
+    if not raw:
+        return list(DEFAULT_MEETING_DAYS)
+    try:
+        return [int(item) for item in str(raw).split(",") if str(item).strip() != ""]
+    except Exception:
+        return list(DEFAULT_MEETING_DAYS)
+
+
+def _parse_family_worship_day(raw: str | None) -> int:
+    if not raw:
+        return DEFAULT_FAMILY_WORSHIP_DAY
+    try:
+        return int(str(raw).strip())
+    except Exception:
+        return DEFAULT_FAMILY_WORSHIP_DAY
+
+
+def _parse_custom_habits(raw: str | None) -> list[dict]:
+    if not raw:
+        return []
+    try:
+        items = json.loads(raw)
+    except Exception:
+        items = []
+    if not isinstance(items, list):
+        return []
+    return [item for item in items if isinstance(item, dict) and item.get("active", True)]
+
+
+async def get_user_settings_many(user_emails: list[str]) -> dict[str, UserSettings]:
+    now = time.monotonic()
+    raw_by_user: dict[str, dict] = {}
+    missing = []
+    for email in dict.fromkeys(user_emails):
+        cached = _USER_SETTINGS_CACHE.get(email)
+        if cached and now - cached[0] < USER_SETTINGS_CACHE_TTL_SECONDS:
+            raw_by_user[email] = cached[1]
+        else:
+            missing.append(email)
+    if missing:
+        generations = {email: _USER_SETTINGS_GENERATION.get(email, 0) for email in missing}
+        key_to_user = {f"{email}::{key}": (email, key) for email in missing for key in USER_SETTINGS_KEYS}
+        session_factory = get_sessionmaker()
+        async with session_factory() as session:
+            rows = (await session.execute(
+                sql_text(f"SELECT key, value FROM {SETTINGS_TABLE} WHERE key IN :keys").bindparams(
+                    bindparam("keys", expanding=True)
+                ),
+                {"keys": list(key_to_user.keys())},
+            )).fetchall()
+        loaded: dict[str, dict] = {email: {} for email in missing}
+        for key, value in rows:
+            email, setting_key = key_to_user[key]
+            loaded[email][setting_key] = value
+        for email, raw in loaded.items():
+            if _USER_SETTINGS_GENERATION.get(email, 0) == generations[email]:
+                _USER_SETTINGS_CACHE[email] = (now, raw)
+            raw_by_user[email] = raw
+    return {email: UserSettings.from_raw(email, raw) for email, raw in raw_by_user.items()}
+
+
+async def get_user_settings(user_email: str) -> UserSettings:
+    return (await get_user_settings_many([user_email]))[user_email]
+
+
 async def get_setting(user_email: str, key: str, scoped: bool = True) -> str | None:
     setting_key = f"{user_email}::{key}" if scoped else key
     session_factory = get_sessionmaker()
@@ -191,8 +327,17 @@ async def get_setting(user_email: str, key: str, scoped: bool = True) -> str | N
     return row[0] if row else None
 
 
+def invalidate_user_settings_cache(user_email: str | None = None) -> None:
+    """Drop cached settings for one user, or for everyone when user_email is None."""
+    emails = [user_email] if user_email else list(_USER_SETTINGS_CACHE)
+    for email in emails:
+        _USER_SETTINGS_GENERATION[email] = _USER_SETTINGS_GENERATION.get(email, 0) + 1
+        _USER_SETTINGS_CACHE.pop(email, None)
+
+
 async def set_setting(user_email: str, key: str, value: str, scoped: bool = True) -> None:
     setting_key = f"{user_email}::{key}" if scoped else key
+    cached_key = scoped and key in USER_SETTINGS_KEYS
     session_factory = get_sessionmaker()
     async with session_factory() as session:
         await session.execute(
@@ -202,73 +347,89 @@ async def set_setting(user_email: str, key: str, value: str, scoped: bool = True
             ),
             {"key": setting_key, "value": value},
         )
+        if cached_key:
+            await notify_settings_changed(session, user_email)
         await session.commit()
+    if cached_key:
+        _USER_SETTINGS_GENERATION[user_email] = _USER_SETTINGS_GENERATION.get(user_email, 0) + 1
+        cached = _USER_SETTINGS_CACHE.get(user_email)
+        if cached:
+            cached[1][key] = value
 
 
 async def get_custom_habit_done(user_email: str, day_iso: str) -> dict:
-    raw = await get_setting(user_email, f"custom_habit_done::{day_iso}")
-    if not raw:
-        return {}
-    try:
-        payload = json.loads(raw)
-    except Exception:
-        payload = {}
-    if not isinstance(payload, dict):
-        payload = {}
-    return {str(k): int(bool(v)) for k, v in payload.items()}
-
-
-async def set_custom_habit_done(user_email: str, day_iso: str, done_map: dict) -> None:
-    clean = {str(k): int(bool(v)) for k, v in (done_map or {}).items()}
-    await set_setting(user_email, f"custom_habit_done::{day_iso}", json.dumps(clean, ensure_ascii=False))
-
-
-async def list_custom_habit_done_range(user_email: str, start_iso: str, end_iso: str) -> dict:
-    prefix = f"{user_email}::custom_habit_done::"
     session_factory = get_sessionmaker()
     async with session_factory() as session:
         rows = (await session.execute(
             sql_text(
                 f"""
-                SELECT key, value
-                FROM {SETTINGS_TABLE}
-                WHERE key LIKE :prefix
+                SELECT habit_id, done
+                FROM {CUSTOM_HABIT_DONE_TABLE}
+                WHERE user_email = :user_email AND date = :date
                 """
             ),
-            {"prefix": f"{prefix}%"},
-        )).mappings().all()
-    payload = {}
+            {"user_email": user_email, "date": day_iso},
+        )).fetchall()
+    return {str(row[0]): int(bool(row[1])) for row in rows}
+
+
+async def set_custom_habit_done(user_email: str, day_iso: str, done_map: dict) -> None:
+    clean = {str(k): int(bool(v)) for k, v in (done_map or {}).items()}
+    now = datetime.utcnow().isoformat()
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        await session.execute(
+            sql_text(f"DELETE FROM {CUSTOM_HABIT_DONE_TABLE} WHERE user_email = :user_email AND date = :date"),
+            {"user_email": user_email, "date": day_iso},
+        )
+        if clean:
+            await session.execute(
+                sql_text(
+                    f"""
+                    INSERT INTO {CUSTOM_HABIT_DONE_TABLE} (user_email, date, habit_id, done, updated_at)
+                    VALUES (:user_email, :date, :habit_id, :done, :updated_at)
+                    """
+                ),
+                [
+                    {"user_email": user_email, "date": day_iso, "habit_id": habit_id, "done": done, "updated_at": now}
+                    for habit_id, done in clean.items()
+                ],
+            )
+        await _refresh_day_snapshots(session, user_email, day_iso, day_iso)
+        await session.commit()
+
+
+async def _custom_habit_done_range(session, user_email: str, start_iso: str, end_iso: str) -> dict:
+    rows = (await session.execute(
+        sql_text(
+            f"""
+            SELECT date, habit_id, done
+            FROM {CUSTOM_HABIT_DONE_TABLE}
+            WHERE user_email = :user_email
+              AND date BETWEEN :start_date AND :end_date
+            """
+        ),
+        {"user_email": user_email, "start_date": start_iso, "end_date": end_iso},
+    )).mappings().all()
+    payload: dict[str, dict] = {}
     for row in rows:
-        key = str(row.get("key") or "")
-        date_part = key.replace(prefix, "", 1)
-        if not date_part:
-            continue
-        if not (start_iso <= date_part <= end_iso):
-            continue
-        try:
-            decoded = json.loads(row.get("value") or "{}")
-        except Exception:
-            decoded = {}
-        if isinstance(decoded, dict):
-            payload[date_part] = {str(k): int(bool(v)) for k, v in decoded.items()}
+        payload.setdefault(str(row["date"])[:10], {})[str(row["habit_id"])] = int(bool(row["done"]))
     return payload
 
 
+async def list_custom_habit_done_range(user_email: str, start_iso: str, end_iso: str) -> dict:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        return await _custom_habit_done_range(session, user_email, start_iso, end_iso)
+
+
 async def list_custom_habits(user_email: str) -> list[dict]:
-    raw = await get_setting(user_email, "custom_habits")
-    if not raw:
-        return []
-    try:
-        items = json.loads(raw)
-    except Exception:
-        items = []
-    if not isinstance(items, list):
-        return []
-    return [item for item in items if isinstance(item, dict) and item.get("active", True)]
+    return [dict(item) for item in (await get_user_settings(user_email)).custom_habits]
 
 
 async def save_custom_habits(user_email: str, habits: list[dict]) -> None:
     await set_setting(user_email, "custom_habits", json.dumps(habits, ensure_ascii=False))
+    await invalidate_day_snapshots(user_email)
 
 
 async def add_custom_habit(user_email: str, name: str) -> dict:
@@ -312,32 +473,157 @@ async def delete_custom_habit(user_email: str, habit_id: str) -> None:
 
 
 async def get_meeting_days(user_email: str) -> list[int]:
-    raw = await get_setting(user_email, "meeting_days")
-    if not raw:
-        return [1, 3]
-    try:
-        return [int(item) for item in str(raw).split(",") if str(item).strip() != ""]
-    except Exception:
-        return [1, 3]
+    return list((await get_user_settings(user_email)).meeting_days)
 
 
 async def set_meeting_days(user_email: str, days: list[int]) -> None:
     clean = [int(day) for day in days if isinstance(day, int) or str(day).isdigit()]
     await set_setting(user_email, "meeting_days", ",".join(map(str, clean)))
+    await refresh_shared_streaks(user_email, sorted(MEETING_HABIT_KEYS))
+    await invalidate_day_snapshots(user_email)
 
 
 async def get_family_worship_day(user_email: str) -> int:
-    raw = await get_setting(user_email, "family_worship_day")
-    if not raw:
-        return 6
-    try:
-        return int(str(raw).strip())
-    except Exception:
-        return 6
+    return (await get_user_settings(user_email)).family_worship_day
 
 
 async def set_family_worship_day(user_email: str, day_index: int) -> None:
     await set_setting(user_email, "family_worship_day", str(int(day_index)))
+    await refresh_shared_streaks(user_email, sorted(FAMILY_WORSHIP_HABIT_KEYS))
+    await invalidate_day_snapshots(user_email)
+
+
+async def _refresh_day_snapshots(
+    session,
+    user_email: str,
+    start_iso: str | None = None,
+    end_iso: str | None = None,
+) -> int:
+    range_clause = ""
+    params = {"user_email": user_email}
+    if start_iso:
+        range_clause += " AND date >= :start_date"
+        params["start_date"] = start_iso
+    if end_iso:
+        range_clause += " AND date <= :end_date"
+        params["end_date"] = end_iso
+    rows = (await session.execute(
+        sql_text(
+            f"""
+            SELECT {', '.join(ENTRY_SELECT_COLUMNS)}
+            FROM {ENTRIES_TABLE}
+            WHERE user_email = :user_email{range_clause}
+            """
+        ),
+        params,
+    )).mappings().all()
+    entries = {str(row["date"])[:10]: dict(row) for row in rows}
+    custom_done = await _custom_habit_done_range(session, user_email, start_iso or "0000-01-01", end_iso or "9999-12-31")
+    if start_iso and start_iso == end_iso:
+        entries.setdefault(start_iso, {})
+    for day_iso in custom_done:
+        entries.setdefault(day_iso, {})
+    if not entries:
+        return 0
+
+    profile = await get_user_settings(user_email)
+    meeting_days = set(profile.meeting_days)
+    family_day = profile.family_worship_day
+    custom_habit_ids = [habit["id"] for habit in profile.custom_habits if habit.get("id")]
+    now = datetime.utcnow().isoformat()
+    snapshots = []
+    for day_iso, row in entries.items():
+        day = _parse_entry_date(day_iso)
+        if day is None:
+            continue
+        snapshot = compute_day_snapshot(
+            row,
+            day,
+            meeting_days,
+            family_day,
+            custom_done.get(day_iso, {}),
+            custom_habit_ids,
+        )
+        snapshots.append({**snapshot, "user_email": user_email, "updated_at": now})
+    if not snapshots:
+        return 0
+    await session.execute(
+        sql_text(
+            f"""
+            INSERT INTO {DAY_SNAPSHOT_CACHE_TABLE}
+                (user_email, date, habits_completed, habits_total, habits_percent, life_balance_score, updated_at)
+            VALUES
+                (:user_email, :date, :habits_completed, :habits_total, :habits_percent, :life_balance_score, :updated_at)
+            ON CONFLICT(user_email, date) DO UPDATE SET
+                habits_completed = EXCLUDED.habits_completed,
+                habits_total = EXCLUDED.habits_total,
+                habits_percent = EXCLUDED.habits_percent,
+                life_balance_score = EXCLUDED.life_balance_score,
+                updated_at = EXCLUDED.updated_at
+            """
+        ),
+        snapshots,
+    )
+    return len(snapshots)
+
+
+async def refresh_day_snapshots(user_email: str, start_iso: str | None = None, end_iso: str | None = None) -> int:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        count = await _refresh_day_snapshots(session, user_email, start_iso, end_iso)
+        await session.commit()
+    return count
+
+
+async def invalidate_day_snapshots(user_email: str) -> None:
+    """Drop a user's snapshots after a settings change; list_day_snapshots rebuilds only the days it is asked for."""
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        await session.execute(
+            sql_text(f"DELETE FROM {DAY_SNAPSHOT_CACHE_TABLE} WHERE user_email = :user_email"),
+            {"user_email": user_email},
+        )
+        await session.commit()
+
+
+async def list_day_snapshots(user_email: str, start_iso: str, end_iso: str) -> list[dict]:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        missing = (await session.execute(
+            sql_text(
+                f"""
+                SELECT COUNT(*)
+                FROM (
+                    SELECT date, updated_at FROM {ENTRIES_TABLE}
+                    WHERE user_email = :user_email AND date BETWEEN :start_date AND :end_date
+                    UNION ALL
+                    SELECT date, updated_at FROM {CUSTOM_HABIT_DONE_TABLE}
+                    WHERE user_email = :user_email AND date BETWEEN :start_date AND :end_date
+                ) d
+                LEFT JOIN {DAY_SNAPSHOT_CACHE_TABLE} s
+                  ON s.user_email = :user_email AND s.date = d.date
+                WHERE s.date IS NULL OR s.updated_at < d.updated_at
+                """
+            ),
+            {"user_email": user_email, "start_date": start_iso, "end_date": end_iso},
+        )).scalar_one()
+        if missing:
+            # Days with no snapshot (old data, a settings change) or written by a client that bypasses the API.
+            await _refresh_day_snapshots(session, user_email, start_iso, end_iso)
+            await session.commit()
+        rows = (await session.execute(
+            sql_text(
+                f"""
+                SELECT date, habits_completed, habits_total, habits_percent, life_balance_score
+                FROM {DAY_SNAPSHOT_CACHE_TABLE}
+                WHERE user_email = :user_email
+                  AND date BETWEEN :start_date AND :end_date
+                ORDER BY date
+                """
+            ),
+            {"user_email": user_email, "start_date": start_iso, "end_date": end_iso},
+        )).mappings().all()
+    return [dict(row) for row in rows]
 
 
 async def list_tasks(user_email: str, start_iso: str, end_iso: str) -> list[dict]:
@@ -440,11 +726,7 @@ async def delete_task_by_google_ids(user_email: str, calendar_id: str, event_id:
         await session.commit()
 
 
-async def upsert_google_task(user_email: str, calendar_id: str, event: dict) -> dict | None:
-    event_id = event.get("id")
-    if not event_id:
-        return None
-    existing = await get_task_by_google_ids(user_email, calendar_id, event_id)
+def _google_event_task_fields(calendar_id: str, event: dict) -> dict:
     title = event.get("summary") or "Google event"
     start = event.get("start") or {}
     scheduled_date = None
@@ -461,29 +743,176 @@ async def upsert_google_task(user_email: str, calendar_id: str, event: dict) ->
         scheduled_date = str(start.get("date"))
         scheduled_time = None
 
-    payload = {
+    return {
         "title": title,
         "scheduled_date": scheduled_date,
         "scheduled_time": scheduled_time,
         "external_event_key": event.get("iCalUID"),
         "google_calendar_id": calendar_id,
-        "google_event_id": event_id,
+        "google_event_id": event.get("id"),
+        # etag changes on every edit of the event; "updated" is the fallback when a response omits it.
+        "google_etag": event.get("etag") or event.get("updated"),
     }
 
-    if existing:
-        await update_task(user_email, existing["id"], payload)
-        return await get_task(user_email, existing["id"])
 
-    return await create_task(
-        user_email,
-        {
-            **payload,
-            "source": "google",
-        },
+async def _stored_google_etags(session: AsyncSession, user_email: str, calendar_id: str, event_ids: list[str]) -> dict:
+    rows = (await session.execute(
+        sql_text(
+            f"""
+            SELECT google_event_id, google_etag
+            FROM {TASKS_TABLE}
+            WHERE user_email = :user_email
+              AND google_calendar_id = :calendar_id
+              AND google_event_id IN :event_ids
+            """
+        ).bindparams(bindparam("event_ids", expanding=True)),
+        {"user_email": user_email, "calendar_id": calendar_id, "event_ids": event_ids},
+    )).all()
+    return {row[0]: row[1] for row in rows}
+
+
+async def upsert_google_tasks(user_email: str, calendar_id: str, events: list[dict]) -> int:
+    """Insert or refresh a page of Google events with one INSERT ... ON CONFLICT per chunk.
+
+    Events whose etag matches the stored one are skipped, so only real changes are written.
+    Returns the number of rows written.
+    """
+    by_event_id: dict[str, dict] = {}
+    for event in events:
+        if event.get("id"):
+            by_event_id[event["id"]] = event
+    if not by_event_id:
+        return 0
+    now = datetime.utcnow().isoformat()
+    columns = [
+        "id",
+        "user_email",
+        "title",
+        "source",
+        "external_event_key",
+        "scheduled_date",
+        "scheduled_time",
+        "priority_tag",
+        "is_done",
+        "google_calendar_id",
+        "google_event_id",
+        "google_etag",
+        "created_at",
+        "updated_at",
+    ]
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        stored_etags = await _stored_google_etags(session, user_email, calendar_id, list(by_event_id))
+        records = []
+        for event_id, event in by_event_id.items():
+            fields = _google_event_task_fields(calendar_id, event)
+            if fields["google_etag"] and stored_etags.get(event_id) == fields["google_etag"]:
+                continue
+            records.append(
+                {
+                    "id": _new_id(),
+                    "user_email": user_email,
+                    "source": "google",
+                    "priority_tag": "Medium",
+                    "is_done": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                    **fields,
+                }
+            )
+        if not records:
+            return 0
+        for offset in range(0, len(records), GOOGLE_UPSERT_CHUNK_SIZE):
+            chunk = records[offset : offset + GOOGLE_UPSERT_CHUNK_SIZE]
+            params = {}
+            values_sql = []
+            for idx, record in enumerate(chunk):
+                placeholders = []
+                for column in columns:
+                    params[f"{column}_{idx}"] = record[column]
+                    placeholders.append(f":{column}_{idx}")
+                values_sql.append(f"({', '.join(placeholders)})")
+            await session.execute(
+                sql_text(
+                    f"""
+                    INSERT INTO {TASKS_TABLE} ({', '.join(columns)})
+                    VALUES {', '.join(values_sql)}
+                    ON CONFLICT(user_email, google_calendar_id, google_event_id) DO UPDATE SET
+                        title = EXCLUDED.title,
+                        scheduled_date = EXCLUDED.scheduled_date,
+                        scheduled_time = EXCLUDED.scheduled_time,
+                        external_event_key = EXCLUDED.external_event_key,
+                        google_etag = EXCLUDED.google_etag,
+                        updated_at = EXCLUDED.updated_at
+                    """
+                ),
+                params,
+            )
+        await session.commit()
+    return len(records)
+
+
+async def delete_tasks_by_google_ids(user_email: str, calendar_id: str, event_ids: list[str]) -> None:
+    event_ids = [event_id for event_id in dict.fromkeys(event_ids) if event_id]
+    if not event_ids:
+        return
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        await session.execute(
+            sql_text(
+                f"""
+                DELETE FROM {TASKS_TABLE}
+                WHERE user_email = :user_email
+                  AND google_calendar_id = :calendar_id
+                  AND google_event_id IN :event_ids
+                """
+            ).bindparams(bindparam("event_ids", expanding=True)),
+            {"user_email": user_email, "calendar_id": calendar_id, "event_ids": event_ids},
+        )
+        await session.commit()
+
+
+async def delete_google_tasks_not_in(
+    user_email: str,
+    calendar_id: str,
+    keep_event_ids: list[str],
+    start_date: str,
+    end_date: str,
+) -> int:
+    """Drop Google-sourced tasks in [start_date, end_date) whose events a full rescan no longer returned."""
+    keep_event_ids = [event_id for event_id in dict.fromkeys(keep_event_ids) if event_id]
+    keep_clause = "AND google_event_id NOT IN :keep_event_ids" if keep_event_ids else ""
+    statement = sql_text(
+        f"""
+        DELETE FROM {TASKS_TABLE}
+        WHERE user_email = :user_email
+          AND source = 'google'
+          AND google_calendar_id = :calendar_id
+          AND scheduled_date >= :start_date
+          AND scheduled_date < :end_date
+          {keep_clause}
+        """
     )
+    params = {"user_email": user_email, "calendar_id": calendar_id, "start_date": start_date, "end_date": end_date}
+    if keep_event_ids:
+        statement = statement.bindparams(bindparam("keep_event_ids", expanding=True))
+        params["keep_event_ids"] = keep_event_ids
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        result = await session.execute(statement, params)
+        await session.commit()
+    return int(result.rowcount or 0)
+
 
+async def upsert_google_task(user_email: str, calendar_id: str, event: dict) -> dict | None:
+    event_id = event.get("id")
+    if not event_id:
+        return None
+    await upsert_google_tasks(user_email, calendar_id, [event])
+    return await get_task_by_google_ids(user_email, calendar_id, event_id)
 
-async def create_task(user_email: str, payload: dict) -> dict:
+
+async def create_task(user_email: str, payload: dict, session: AsyncSession | None = None) -> dict:
     task_id = _new_id()
     record = {
         "id": task_id,
@@ -502,8 +931,7 @@ async def create_task(user_email: str, payload: dict) -> dict:
         "created_at": datetime.utcnow().isoformat(),
         "updated_at": datetime.utcnow().isoformat(),
     }
-    session_factory = get_sessionmaker()
-    async with session_factory() as session:
+    async with _session_scope(session) as session:
         await session.execute(
             sql_text(
                 f"""
@@ -519,11 +947,10 @@ async def create_task(user_email: str, payload: dict) -> dict:
             ),
             record,
         )
-        await session.commit()
     return record
 
 
-async def update_task(user_email: str, task_id: str, patch: dict) -> dict:
+def _task_update_params(patch: dict) -> dict:
     allowed = {
         "title",
         "scheduled_date",
@@ -536,12 +963,10 @@ async def update_task(user_email: str, task_id: str, patch: dict) -> dict:
         "google_event_id",
         "external_event_key",
     }
-    updates = []
-    params = {"id": task_id, "user_email": user_email}
+    params = {}
     for key, value in patch.items():
         if key not in allowed:
             continue
-        updates.append(f"{key} = :{key}")
         if key == "priority_tag":
             params[key] = _normalize_priority(value)
         elif key in {"estimated_minutes", "actual_minutes"}:
@@ -554,25 +979,85 @@ async def update_task(user_email: str, task_id: str, patch: dict) -> dict:
             params[key] = value.isoformat()
         else:
             params[key] = value
-    if not updates:
-        return await get_task(user_email, task_id)
+    return params
+
+
+async def _update_task_changes(session, user_email: str, task_id: str, patch: dict) -> tuple[dict, set[str]]:
+    """Write only the columns whose values differ from the stored task; return (task, changed keys)."""
+    params = _task_update_params(patch)
+    current = await get_task(user_email, task_id, session=session)
+    if not params or not current:
+        return current, set()
+    stored = dict(current)
+    stored["scheduled_time"] = _normalize_time_value(stored.get("scheduled_time"))
+    changed = {key for key, value in params.items() if stored.get(key) != value}
+    if not changed:
+        return current, set()
+    updates = [f"{key} = :{key}" for key in sorted(changed)]
     updates.append("updated_at = :updated_at")
-    params["updated_at"] = datetime.utcnow().isoformat()
-    session_factory = get_sessionmaker()
-    async with session_factory() as session:
-        await session.execute(
-            sql_text(
-                f"UPDATE {TASKS_TABLE} SET {', '.join(updates)} WHERE id = :id AND user_email = :user_email"
-            ),
-            params,
-        )
-        await session.commit()
-    return await get_task(user_email, task_id)
-
-
-async def get_task(user_email: str, task_id: str) -> dict:
-    session_factory = get_sessionmaker()
-    async with session_factory() as session:
+    values = {key: params[key] for key in changed}
+    values.update({"id": task_id, "user_email": user_email, "updated_at": datetime.utcnow().isoformat()})
+    await session.execute(
+        sql_text(
+            f"UPDATE {TASKS_TABLE} SET {', '.join(updates)} WHERE id = :id AND user_email = :user_email"
+        ),
+        values,
+    )
+    return await get_task(user_email, task_id, session=session), changed
+
+
+async def update_task(user_email: str, task_id: str, patch: dict, session: AsyncSession | None = None) -> dict:
+    async with _session_scope(session) as session:
+        record, _ = await _update_task_changes(session, user_email, task_id, patch)
+        return record
+
+
+async def _has_inflight_outbox_create(session, user_email: str, task_id: str) -> bool:
+    row = (await session.execute(
+        sql_text(
+            f"""
+            SELECT 1 FROM {SYNC_OUTBOX_TABLE}
+            WHERE user_email = :user_email
+              AND entity_type = 'task'
+              AND entity_id = :entity_id
+              AND action = 'create'
+              AND status IN ('pending', 'processing')
+            LIMIT 1
+            """
+        ),
+        {"user_email": user_email, "entity_id": task_id},
+    )).fetchone()
+    return row is not None
+
+
+async def update_task_and_enqueue(
+    user_email: str,
+    task_id: str,
+    patch: dict,
+    session: AsyncSession | None = None,
+) -> dict:
+    """Apply a task patch and queue a Google update only when the event itself would change."""
+    async with _session_scope(session) as session:
+        record, changed = await _update_task_changes(session, user_email, task_id, patch)
+        google_changes = changed & GOOGLE_EVENT_TASK_FIELDS
+        if not google_changes:
+            return record
+        # A create still in flight will link the task moments from now; its event must not miss this edit.
+        linked = bool(record.get("google_event_id")) or await _has_inflight_outbox_create(session, user_email, task_id)
+        if linked:
+            await enqueue_outbox(
+                user_email,
+                "task",
+                task_id,
+                "update",
+                {key: record.get(key) for key in sorted(google_changes)},
+                session=session,
+            )
+        return record
+
+
+async def get_task(user_email: str, task_id: str, session: AsyncSession | None = None) -> dict:
+    async with _session_scope(session) as session:
         row = (await session.execute(
             sql_text(
                 f"""
@@ -589,9 +1074,30 @@ async def get_task(user_email: str, task_id: str) -> dict:
     return _normalize_task_row(row) if row else {}
 
 
-async def delete_task(user_email: str, task_id: str) -> None:
+async def get_tasks_by_ids(task_ids: list[str]) -> dict[str, dict]:
+    task_ids = [task_id for task_id in dict.fromkeys(task_ids) if task_id]
+    if not task_ids:
+        return {}
     session_factory = get_sessionmaker()
     async with session_factory() as session:
+        rows = (await session.execute(
+            sql_text(
+                f"""
+                SELECT
+                    id, user_email, title, source, external_event_key, scheduled_date, scheduled_time,
+                    priority_tag, estimated_minutes, actual_minutes, is_done,
+                    google_calendar_id, google_event_id, created_at, updated_at
+                FROM {TASKS_TABLE}
+                WHERE id IN :ids
+                """
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": task_ids},
+        )).mappings().all()
+    return {row["id"]: _normalize_task_row(row) for row in rows}
+
+
+async def delete_task(user_email: str, task_id: str, session: AsyncSession | None = None) -> None:
+    async with _session_scope(session) as session:
         await session.execute(
             sql_text(f"DELETE FROM {SUBTASKS_TABLE} WHERE user_email = :user_email AND task_id = :task_id"),
             {"user_email": user_email, "task_id": task_id},
@@ -600,7 +1106,6 @@ async def delete_task(user_email: str, task_id: str) -> None:
             sql_text(f"DELETE FROM {TASKS_TABLE} WHERE user_email = :user_email AND id = :task_id"),
             {"user_email": user_email, "task_id": task_id},
         )
-        await session.commit()
 
 
 async def list_subtasks(task_ids: list[str], user_email: str) -> dict[str, list[dict]]:
@@ -699,8 +1204,14 @@ async def delete_subtask(user_email: str, subtask_id: str) -> None:
         await session.commit()
 
 
-async def enqueue_outbox(user_email: str, entity_type: str, entity_id: str, action: str, payload: dict | None = None) -> None:
-    session_factory = get_sessionmaker()
+async def enqueue_outbox(
+    user_email: str,
+    entity_type: str,
+    entity_id: str,
+    action: str,
+    payload: dict | None = None,
+    session: AsyncSession | None = None,
+) -> None:
     now = datetime.utcnow().isoformat()
     row = {
         "id": _new_id(),
@@ -716,7 +1227,10 @@ async def enqueue_outbox(user_email: str, entity_type: str, entity_id: str, acti
         "created_at": now,
         "updated_at": now,
     }
-    async with session_factory() as session:
+    async with _session_scope(session) as session:
+        await notify_outbox(session, user_email)
+        if await _coalesce_outbox(session, row, payload or {}):
+            return
         await session.execute(
             sql_text(
                 f"""
@@ -727,7 +1241,88 @@ async def enqueue_outbox(user_email: str, entity_type: str, entity_id: str, acti
             ),
             row,
         )
-        await session.commit()
+
+
+async def _coalesce_outbox(session, row: dict, payload: dict) -> bool:
+    """Fold a new event into pending rows for the same entity; return True when no insert is needed.
+
+    Only fresh rows ('pending' with attempts = 0) are touched: a claimed or retrying row may already
+    have reached Google. create+update stays create (the worker reads the current task), update+update
+    keeps one row with the merged patch, and create+delete cancels out unless Google may know the event.
+    Writes re-check status and attempts so a row claimed since the SELECT is left alone (SQLite has no
+    FOR UPDATE); in that case the new event is inserted instead.
+    """
+    action = row["action"]
+    if action not in {"update", "delete"}:
+        return False
+    lock_clause = "FOR UPDATE" if _is_postgres() else ""
+    pending = (await session.execute(
+        sql_text(
+            f"""
+            SELECT id, action, payload_json, status, attempts
+            FROM {SYNC_OUTBOX_TABLE}
+            WHERE user_email = :user_email
+              AND entity_type = :entity_type
+              AND entity_id = :entity_id
+              AND status IN ('pending', 'processing')
+            ORDER BY created_at ASC
+            {lock_clause}
+            """
+        ),
+        {"user_email": row["user_email"], "entity_type": row["entity_type"], "entity_id": row["entity_id"]},
+    )).mappings().all()
+    fresh = [item for item in pending if item["status"] == "pending" and int(item["attempts"] or 0) == 0]
+    if not fresh:
+        return False
+    fresh_clause = "status = 'pending' AND attempts = 0"
+
+    if action == "update":
+        if any(item["action"] == "delete" for item in pending):
+            return False
+        if any(item["action"] == "create" for item in fresh):
+            target = next(item for item in fresh if item["action"] == "create")
+            still_fresh = (await session.execute(
+                sql_text(f"SELECT 1 FROM {SYNC_OUTBOX_TABLE} WHERE id = :id AND {fresh_clause}"),
+                {"id": target["id"]},
+            )).first()
+            return still_fresh is not None
+        target = fresh[-1]
+        if target["id"] != pending[-1]["id"]:
+            return False
+        try:
+            merged = json.loads(target["payload_json"] or "{}")
+        except Exception:
+            merged = {}
+        if not isinstance(merged, dict):
+            merged = {}
+        merged.update(payload)
+        result = await session.execute(
+            sql_text(
+                f"""
+                UPDATE {SYNC_OUTBOX_TABLE}
+                SET payload_json = :payload_json, updated_at = :updated_at
+                WHERE id = :id AND {fresh_clause}
+                """
+            ),
+            {
+                "id": target["id"],
+                "payload_json": json.dumps(merged, ensure_ascii=False, default=str),
+                "updated_at": row["updated_at"],
+            },
+        )
+        return result.rowcount == 1
+
+    dropped_create = False
+    for item in fresh:
+        result = await session.execute(
+            sql_text(f"DELETE FROM {SYNC_OUTBOX_TABLE} WHERE id = :id AND {fresh_clause}"),
+            {"id": item["id"]},
+        )
+        if result.rowcount == 1 and item["action"] == "create":
+            dropped_create = True
+    if len(fresh) != len(pending):
+        return False
+    return dropped_create and not payload.get("google_event_id")
 
 
 async def list_pending_outbox(limit: int = 25) -> list[dict]:
@@ -751,41 +1346,151 @@ async def list_pending_outbox(limit: int = 25) -> list[dict]:
     return [dict(row) for row in rows]
 
 
-async def mark_outbox_done(outbox_id: str) -> None:
+async def claim_outbox_batch(
+    limit: int,
+    claimed_by: str,
+    lease_seconds: int = OUTBOX_LEASE_SECONDS,
+    exclude_users: list[str] | None = None,
+) -> list[dict]:
+    """Atomically move due rows (and rows whose lease expired) to 'processing' for this worker.
+
+    Rows are dealt round-robin across users, and within each user fresh creates/updates come
+    before fresh deletes, which come before retries, so one user's backlog cannot starve the other.
+    Only the oldest open row of each entity is claimable, so a newer update or delete never reaches
+    Google before an older retrying create. Users in exclude_users (currently throttled by Google)
+    are left alone.
+    """
+    now_dt = datetime.utcnow()
+    now = now_dt.isoformat()
+    exclude_users = [user.lower() for user in exclude_users or []]
+    exclude_clause = "AND user_email NOT IN :exclude_users" if exclude_users else ""
+    due_clause = f"""
+        ((status = 'pending' AND (next_retry_at IS NULL OR next_retry_at <= :now))
+         OR (status = 'processing' AND lease_expires_at <= :now))
+        {exclude_clause}
+    """
+    head_clause = f"""
+        NOT EXISTS (
+            SELECT 1 FROM {SYNC_OUTBOX_TABLE} AS earlier
+            WHERE earlier.user_email = candidate.user_email
+              AND earlier.entity_type = candidate.entity_type
+              AND earlier.entity_id = candidate.entity_id
+              AND earlier.status IN ('pending', 'processing')
+              AND (earlier.created_at < candidate.created_at
+                   OR (earlier.created_at = candidate.created_at AND earlier.id < candidate.id))
+        )
+    """
+    priority_expr = """
+        CASE
+            WHEN attempts > 0 OR status = 'processing' THEN 2
+            WHEN action IN ('create', 'update') THEN 0
+            ELSE 1
+        END
+    """
+    if _is_postgres():
+        # Window functions cannot share a SELECT with FOR UPDATE, so lock each user's head
+        # rows in a LATERAL subquery and rank them outside it.
+        candidates_sql = f"""
+            SELECT picked.id, picked.priority, picked.created_at,
+                   ROW_NUMBER() OVER (PARTITION BY picked.user_email ORDER BY picked.priority, picked.created_at) AS user_rank
+            FROM (SELECT DISTINCT user_email FROM {SYNC_OUTBOX_TABLE} WHERE {due_clause}) AS users
+            CROSS JOIN LATERAL (
+                SELECT id, user_email, created_at, {priority_expr} AS priority
+                FROM {SYNC_OUTBOX_TABLE} AS candidate
+                WHERE user_email = users.user_email AND {due_clause} AND {head_clause}
+                ORDER BY priority, created_at
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            ) AS picked
+        """
+    else:
+        candidates_sql = f"""
+            SELECT id, {priority_expr} AS priority, created_at,
+                   ROW_NUMBER() OVER (PARTITION BY user_email ORDER BY {priority_expr}, created_at) AS user_rank
+            FROM {SYNC_OUTBOX_TABLE} AS candidate
+            WHERE {due_clause} AND {head_clause}
+        """
+    statement_params = {
+        "claimed_by": claimed_by,
+        "lease_expires_at": (now_dt + timedelta(seconds=lease_seconds)).isoformat(),
+        "now": now,
+        "limit": limit,
+    }
+    if exclude_users:
+        statement_params["exclude_users"] = exclude_users
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        statement = sql_text(
+            f"""
+            UPDATE {SYNC_OUTBOX_TABLE}
+            SET status = 'processing',
+                claimed_by = :claimed_by,
+                lease_expires_at = :lease_expires_at,
+                updated_at = :now
+            WHERE id IN (
+                SELECT ranked.id FROM ({candidates_sql}) AS ranked
+                ORDER BY ranked.user_rank, ranked.priority, ranked.created_at
+                LIMIT :limit
+            )
+            RETURNING id, user_email, entity_type, entity_id, action, payload_json,
+                      status, attempts, next_retry_at, last_error, created_at, updated_at
+            """
+        )
+        if exclude_users:
+            statement = statement.bindparams(bindparam("exclude_users", expanding=True))
+        rows = (await session.execute(statement, statement_params)).mappings().all()
+        await session.commit()
+    return sorted((dict(row) for row in rows), key=lambda row: str(row.get("created_at") or ""))
+
+
+async def mark_outbox_done(outbox_id: str, claimed_by: str | None = None) -> None:
+    claim_clause = "AND claimed_by = :claimed_by" if claimed_by else ""
     session_factory = get_sessionmaker()
     async with session_factory() as session:
         await session.execute(
             sql_text(
                 f"""
                 UPDATE {SYNC_OUTBOX_TABLE}
-                SET status = 'done', updated_at = :updated_at
-                WHERE id = :id
+                SET status = 'done', lease_expires_at = NULL, updated_at = :updated_at
+                WHERE id = :id {claim_clause}
                 """
             ),
-            {"id": outbox_id, "updated_at": datetime.utcnow().isoformat()},
+            {"id": outbox_id, "claimed_by": claimed_by, "updated_at": datetime.utcnow().isoformat()},
         )
         await session.commit()
 
 
-async def mark_outbox_error(outbox_id: str, attempts: int, next_retry_at: str, error: str) -> None:
+async def mark_outbox_error(
+    outbox_id: str,
+    attempts: int,
+    next_retry_at: str,
+    error: str,
+    claimed_by: str | None = None,
+) -> None:
+    """Schedule a retry, or dead-letter the row once it has used OUTBOX_MAX_ATTEMPTS."""
+    claim_clause = "AND claimed_by = :claimed_by" if claimed_by else ""
+    status = "dead" if attempts >= OUTBOX_MAX_ATTEMPTS else "pending"
     session_factory = get_sessionmaker()
     async with session_factory() as session:
         await session.execute(
             sql_text(
                 f"""
                 UPDATE {SYNC_OUTBOX_TABLE}
-                SET status = 'pending',
+                SET status = :status,
                     attempts = :attempts,
                     next_retry_at = :next_retry_at,
                     last_error = :last_error,
+                    lease_expires_at = NULL,
                     updated_at = :updated_at
-                WHERE id = :id
+                WHERE id = :id {claim_clause}
                 """
             ),
             {
                 "id": outbox_id,
+                "claimed_by": claimed_by,
+                "status": status,
                 "attempts": attempts,
-                "next_retry_at": next_retry_at,
+                "next_retry_at": None if status == "dead" else next_retry_at,
                 "last_error": error[:500],
                 "updated_at": datetime.utcnow().isoformat(),
             },
@@ -793,6 +1498,166 @@ async def mark_outbox_error(outbox_id: str, attempts: int, next_retry_at: str, e
         await session.commit()
 
 
+async def save_task_event_links(task_links: list[dict]) -> None:
+    """Store the Google event (and its etag) a task maps to, right after Google accepted a write.
+
+    Keeping the etag current lets the next incremental sync skip the event the worker just wrote.
+    """
+    if not task_links:
+        return
+    now = datetime.utcnow().isoformat()
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        await session.execute(
+            sql_text(
+                f"""
+                UPDATE {TASKS_TABLE}
+                SET google_calendar_id = :google_calendar_id,
+                    google_event_id = :google_event_id,
+                    google_etag = :google_etag,
+                    updated_at = :updated_at
+                WHERE id = :id AND user_email = :user_email
+                """
+            ),
+            [{"google_etag": None, **link, "updated_at": now} for link in task_links],
+        )
+        await session.commit()
+
+
+async def complete_outbox_batch(claimed_by: str, done_ids: list[str], failures: list[dict]) -> None:
+    """Record a drained batch in one transaction: done rows and retries/dead letters."""
+    now = datetime.utcnow().isoformat()
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        if done_ids:
+            await session.execute(
+                sql_text(
+                    f"""
+                    UPDATE {SYNC_OUTBOX_TABLE}
+                    SET status = 'done', lease_expires_at = NULL, updated_at = :updated_at
+                    WHERE id IN :ids AND claimed_by = :claimed_by
+                    """
+                ).bindparams(bindparam("ids", expanding=True)),
+                {"ids": list(done_ids), "claimed_by": claimed_by, "updated_at": now},
+            )
+        if failures:
+            await session.execute(
+                sql_text(
+                    f"""
+                    UPDATE {SYNC_OUTBOX_TABLE}
+                    SET status = :status,
+                        attempts = :attempts,
+                        next_retry_at = :next_retry_at,
+                        last_error = :last_error,
+                        lease_expires_at = NULL,
+                        updated_at = :updated_at
+                    WHERE id = :id AND claimed_by = :claimed_by
+                    """
+                ),
+                [
+                    {
+                        "id": failure["id"],
+                        "claimed_by": claimed_by,
+                        "status": "dead" if failure["attempts"] >= OUTBOX_MAX_ATTEMPTS else "pending",
+                        "attempts": failure["attempts"],
+                        "next_retry_at": None if failure["attempts"] >= OUTBOX_MAX_ATTEMPTS else failure["next_retry_at"],
+                        "last_error": str(failure.get("last_error") or "")[:500],
+                        "updated_at": now,
+                    }
+                    for failure in failures
+                ],
+            )
+        await session.commit()
+
+
+async def purge_done_outbox(older_than: timedelta) -> int:
+    cutoff = (datetime.utcnow() - older_than).isoformat()
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        result = await session.execute(
+            sql_text(f"DELETE FROM {SYNC_OUTBOX_TABLE} WHERE status = 'done' AND updated_at < :cutoff"),
+            {"cutoff": cutoff},
+        )
+        await session.commit()
+    return int(result.rowcount or 0)
+
+
+async def list_dead_outbox(user_email: str, limit: int = 100) -> list[dict]:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        rows = (await session.execute(
+            sql_text(
+                f"""
+                SELECT id, user_email, entity_type, entity_id, action, payload_json,
+                       status, attempts, last_error, created_at, updated_at
+                FROM {SYNC_OUTBOX_TABLE}
+                WHERE user_email = :user_email AND status = 'dead'
+                ORDER BY updated_at DESC
+                LIMIT :limit
+                """
+            ),
+            {"user_email": user_email, "limit": limit},
+        )).mappings().all()
+    return [dict(row) for row in rows]
+
+
+async def replay_dead_outbox(user_email: str, outbox_ids: list[str] | None = None) -> int:
+    """Put dead-lettered rows back in the queue with a fresh attempt budget."""
+    id_clause = "AND id IN :ids" if outbox_ids else ""
+    statement = sql_text(
+        f"""
+        UPDATE {SYNC_OUTBOX_TABLE}
+        SET status = 'pending',
+            attempts = 0,
+            next_retry_at = NULL,
+            claimed_by = NULL,
+            lease_expires_at = NULL,
+            updated_at = :updated_at
+        WHERE user_email = :user_email AND status = 'dead' {id_clause}
+        """
+    )
+    params = {"user_email": user_email, "updated_at": datetime.utcnow().isoformat()}
+    if outbox_ids:
+        statement = statement.bindparams(bindparam("ids", expanding=True))
+        params["ids"] = list(outbox_ids)
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        result = await session.execute(statement, params)
+        replayed = int(result.rowcount or 0)
+        if replayed:
+            await notify_outbox(session, user_email)
+        await session.commit()
+    return replayed
+
+
+async def get_google_quota_usage(user_email: str, day: str) -> int:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        value = (await session.execute(
+            sql_text(f"SELECT request_count FROM {GOOGLE_QUOTA_TABLE} WHERE user_email = :user_email AND day = :day"),
+            {"user_email": user_email.lower(), "day": day},
+        )).scalar()
+    return int(value or 0)
+
+
+async def add_google_quota_usage(user_email: str, day: str, count: int) -> None:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        await session.execute(
+            sql_text(
+                f"""
+                INSERT INTO {GOOGLE_QUOTA_TABLE} (user_email, day, request_count, updated_at)
+                VALUES (:user_email, :day, :count, :updated_at)
+                ON CONFLICT(user_email, day) DO UPDATE SET
+                    request_count = {GOOGLE_QUOTA_TABLE}.request_count + EXCLUDED.request_count,
+                    updated_at = EXCLUDED.updated_at
+                """
+            ),
+            {"user_email": user_email.lower(), "day": day, "count": count, "updated_at": datetime.utcnow().isoformat()},
+        )
+        await session.commit()
+
+
 async def get_google_tokens(user_email: str) -> dict | None:
     session_factory = get_sessionmaker()
     async with session_factory() as session:
@@ -871,23 +1736,40 @@ async def get_sync_cursor(user_email: str, calendar_id: str) -> dict | None:
     async with session_factory() as session:
         row = (await session.execute(
             sql_text(
-                f"SELECT user_email, calendar_id, sync_token, last_synced_at, last_error FROM {SYNC_CURSOR_TABLE} WHERE user_email = :user_email AND calendar_id = :calendar_id"
+                f"""
+                SELECT user_email, calendar_id, sync_token, page_token, window_min, window_max, last_synced_at, last_error
+                FROM {SYNC_CURSOR_TABLE}
+                WHERE user_email = :user_email AND calendar_id = :calendar_id
+                """
             ),
             {"user_email": user_email, "calendar_id": calendar_id},
         )).mappings().fetchone()
     return dict(row) if row else None
 
 
-async def update_sync_cursor(user_email: str, calendar_id: str, sync_token: str | None, last_error: str | None) -> None:
+async def update_sync_cursor(
+    user_email: str,
+    calendar_id: str,
+    sync_token: str | None,
+    last_error: str | None,
+    page_token: str | None = None,
+    window_min: str | None = None,
+    window_max: str | None = None,
+) -> None:
+    """Persist sync progress; a non-null page_token marks a scan that can resume mid-way."""
     session_factory = get_sessionmaker()
     async with session_factory() as session:
         await session.execute(
             sql_text(
                 f"""
-                INSERT INTO {SYNC_CURSOR_TABLE} (user_email, calendar_id, sync_token, last_synced_at, last_error)
-                VALUES (:user_email, :calendar_id, :sync_token, :last_synced_at, :last_error)
+                INSERT INTO {SYNC_CURSOR_TABLE}
+                (user_email, calendar_id, sync_token, page_token, window_min, window_max, last_synced_at, last_error)
+                VALUES (:user_email, :calendar_id, :sync_token, :page_token, :window_min, :window_max, :last_synced_at, :last_error)
                 ON CONFLICT(user_email, calendar_id) DO UPDATE SET
                     sync_token = EXCLUDED.sync_token,
+                    page_token = EXCLUDED.page_token,
+                    window_min = EXCLUDED.window_min,
+                    window_max = EXCLUDED.window_max,
                     last_synced_at = EXCLUDED.last_synced_at,
                     last_error = EXCLUDED.last_error
                 """
@@ -896,6 +1778,9 @@ async def update_sync_cursor(user_email: str, calendar_id: str, sync_token: str
                 "user_email": user_email,
                 "calendar_id": calendar_id,
                 "sync_token": sync_token,
+                "page_token": page_token,
+                "window_min": window_min,
+                "window_max": window_max,
                 "last_synced_at": datetime.utcnow().isoformat(),
                 "last_error": last_error,
             },
@@ -903,6 +1788,188 @@ async def update_sync_cursor(user_email: str, calendar_id: str, sync_token: str
         await session.commit()
 
 
+async def set_sync_cursor_error(user_email: str, calendar_id: str, last_error: str | None) -> None:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        await session.execute(
+            sql_text(
+                f"""
+                INSERT INTO {SYNC_CURSOR_TABLE} (user_email, calendar_id, last_error)
+                VALUES (:user_email, :calendar_id, :last_error)
+                ON CONFLICT(user_email, calendar_id) DO UPDATE SET last_error = EXCLUDED.last_error
+                """
+            ),
+            {"user_email": user_email, "calendar_id": calendar_id, "last_error": last_error},
+        )
+        await session.commit()
+
+
+def _normalize_sync_job_row(row) -> dict:
+    item = dict(row)
+    for key in ("progress", "result"):
+        raw = item.pop(f"{key}_json", None)
+        try:
+            item[key] = json.loads(raw) if raw else None
+        except Exception:
+            item[key] = None
+    return item
+
+
+async def create_sync_job(user_email: str, kind: str) -> dict:
+    now = datetime.utcnow().isoformat()
+    row = {
+        "id": _new_id(),
+        "user_email": user_email,
+        "kind": kind,
+        "status": "queued",
+        "progress_json": None,
+        "result_json": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None,
+    }
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        await session.execute(
+            sql_text(
+                f"""
+                INSERT INTO {SYNC_JOBS_TABLE}
+                (id, user_email, kind, status, progress_json, result_json, error, created_at, updated_at, finished_at)
+                VALUES (:id, :user_email, :kind, :status, :progress_json, :result_json, :error, :created_at, :updated_at, :finished_at)
+                """
+            ),
+            row,
+        )
+        await session.commit()
+    return _normalize_sync_job_row(row)
+
+
+async def update_sync_job(
+    job_id: str,
+    status: str,
+    progress: dict | None = None,
+    result: dict | None = None,
+    error: str | None = None,
+) -> None:
+    now = datetime.utcnow().isoformat()
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        await session.execute(
+            sql_text(
+                f"""
+                UPDATE {SYNC_JOBS_TABLE}
+                SET status = :status,
+                    progress_json = COALESCE(:progress_json, progress_json),
+                    result_json = COALESCE(:result_json, result_json),
+                    error = :error,
+                    updated_at = :updated_at,
+                    finished_at = :finished_at
+                WHERE id = :id
+                """
+            ),
+            {
+                "id": job_id,
+                "status": status,
+                "progress_json": json.dumps(progress, ensure_ascii=False, default=str) if progress is not None else None,
+                "result_json": json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                "error": error,
+                "updated_at": now,
+                "finished_at": now if status in {"done", "error"} else None,
+            },
+        )
+        await session.commit()
+
+
+async def get_sync_job(user_email: str, job_id: str) -> dict | None:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        row = (await session.execute(
+            sql_text(
+                f"""
+                SELECT id, user_email, kind, status, progress_json, result_json, error, created_at, updated_at, finished_at
+                FROM {SYNC_JOBS_TABLE}
+                WHERE id = :id AND user_email = :user_email
+                """
+            ),
+            {"id": job_id, "user_email": user_email},
+        )).mappings().fetchone()
+    return _normalize_sync_job_row(row) if row else None
+
+
+async def fail_stale_sync_jobs(older_than: timedelta) -> int:
+    """Mark queued/running jobs that stopped reporting progress (their process died) as failed."""
+    now = datetime.utcnow()
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        result = await session.execute(
+            sql_text(
+                f"""
+                UPDATE {SYNC_JOBS_TABLE}
+                SET status = 'error',
+                    error = 'Interrupted before completion',
+                    updated_at = :now,
+                    finished_at = :now
+                WHERE status IN ('queued', 'running') AND updated_at < :cutoff
+                """
+            ),
+            {"now": now.isoformat(), "cutoff": (now - older_than).isoformat()},
+        )
+        await session.commit()
+    return int(result.rowcount or 0)
+
+
+async def purge_finished_sync_jobs(older_than: timedelta) -> int:
+    cutoff = (datetime.utcnow() - older_than).isoformat()
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        result = await session.execute(
+            sql_text(
+                f"DELETE FROM {SYNC_JOBS_TABLE} WHERE status IN ('done', 'error') AND finished_at < :cutoff"
+            ),
+            {"cutoff": cutoff},
+        )
+        await session.commit()
+    return int(result.rowcount or 0)
+
+
+async def get_stored_calendar_timezone(user_email: str, calendar_id: str) -> dict | None:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        row = (await session.execute(
+            sql_text(
+                f"SELECT calendar_timezone, timezone_fetched_at FROM {SYNC_CURSOR_TABLE} WHERE user_email = :user_email AND calendar_id = :calendar_id"
+            ),
+            {"user_email": user_email, "calendar_id": calendar_id},
+        )).mappings().fetchone()
+    if not row or not row.get("calendar_timezone"):
+        return None
+    return dict(row)
+
+
+async def store_calendar_timezone(user_email: str, calendar_id: str, timezone_name: str) -> None:
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        await session.execute(
+            sql_text(
+                f"""
+                INSERT INTO {SYNC_CURSOR_TABLE} (user_email, calendar_id, calendar_timezone, timezone_fetched_at)
+                VALUES (:user_email, :calendar_id, :calendar_timezone, :timezone_fetched_at)
+                ON CONFLICT(user_email, calendar_id) DO UPDATE SET
+                    calendar_timezone = EXCLUDED.calendar_timezone,
+                    timezone_fetched_at = EXCLUDED.timezone_fetched_at
+                """
+            ),
+            {
+                "user_email": user_email,
+                "calendar_id": calendar_id,
+                "calendar_timezone": timezone_name,
+                "timezone_fetched_at": datetime.utcnow().isoformat(),
+            },
+        )
+        await session.commit()
+
+
 async def get_couple_mood_feed(user_a: str, user_b: str, start_date: date, end_date: date) -> list[dict]:
     session_factory = get_sessionmaker()
     async with session_factory() as session:
@@ -928,89 +1995,318 @@ async def get_couple_mood_feed(user_a: str, user_b: str, start_date: date, end_d
     return [dict(row) for row in rows]
 
 
-async def get_shared_habit_comparison(today: date, user_a: str, user_b: str, habit_keys: list[str]) -> dict:
-    start_window = today - timedelta(days=400)
+def _couple_key(user_a: str, user_b: str | None = None) -> str:
+    members = sorted({email.lower() for email in (user_a, user_b) if email})
+    return "|".join(members)
+
+
+def _parse_entry_date(value) -> date | None:
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except Exception:
+        return None
+
+
+def _habit_valid_weekdays(habit_key: str, meeting_days, family_day) -> set[int] | None:
+    if habit_key in MEETING_HABIT_KEYS:
+        return set(meeting_days)
+    if habit_key in FAMILY_WORSHIP_HABIT_KEYS:
+        return {family_day}
+    return None
+
+
+def _previous_valid_day(day: date, valid_weekdays: set[int] | None) -> date | None:
+    current = day - timedelta(days=1)
+    if valid_weekdays is None:
+        return current
+    for _ in range(7):
+        if current.weekday() in valid_weekdays:
+            return current
+        current = current - timedelta(days=1)
+    return None
+
+
+def _streak_state_from_dates(done_dates: list[date], valid_weekdays: set[int] | None) -> tuple[date | None, int]:
+    """Return (last_done_date, run_length) for the most recent run in descending done_dates."""
+    last_done = None
+    count = 0
+    expected = None
+    for day in done_dates:
+        if valid_weekdays is not None and day.weekday() not in valid_weekdays:
+            continue
+        if last_done is None:
+            last_done = day
+            count = 1
+        elif day == expected:
+            count += 1
+        else:
+            break
+        expected = _previous_valid_day(day, valid_weekdays)
+    return last_done, count
+
+
+def _streak_days_for_today(
+    last_done: date | None,
+    streak_days: int,
+    today: date,
+    valid_weekdays: set[int] | None,
+    include_today: bool,
+) -> int:
+    if last_done is None or streak_days <= 0:
+        return 0
+    if include_today and last_done == today:
+        return streak_days
+    if last_done == _previous_valid_day(today, valid_weekdays):
+        return streak_days
+    return 0
+
+
+async def _scan_streak_state(
+    session,
+    user_email: str,
+    habit_key: str,
+    valid_weekdays: set[int] | None,
+    until_iso: str | None = None,
+) -> tuple[date | None, int]:
+    if valid_weekdays is not None and not valid_weekdays:
+        return None, 0
+    until_clause = "AND date <= :until_date" if until_iso else ""
+    rows = (await session.execute(
+        sql_text(
+            f"""
+            SELECT date FROM {ENTRIES_TABLE}
+            WHERE user_email = :user_email
+              AND {habit_key} = 1
+              {until_clause}
+            ORDER BY date DESC
+            LIMIT :limit
+            """
+        ),
+        {"user_email": user_email, "until_date": until_iso, "limit": STREAK_LOOKBACK_DAYS},
+    )).fetchall()
+    done_dates = [parsed for parsed in (_parse_entry_date(row[0]) for row in rows) if parsed]
+    return _streak_state_from_dates(done_dates, valid_weekdays)
+
+
+async def _store_streak_state(
+    session,
+    couple_key: str,
+    habit_key: str,
+    user_email: str,
+    last_done: date | None,
+    streak_days: int,
+) -> None:
+    await session.execute(
+        sql_text(
+            f"""
+            INSERT INTO {SHARED_STREAK_CACHE_TABLE}
+                (couple_key, habit_key, user_email, streak_days, last_done_date, updated_at)
+            VALUES
+                (:couple_key, :habit_key, :user_email, :streak_days, :last_done_date, :updated_at)
+            ON CONFLICT(couple_key, habit_key, user_email) DO UPDATE SET
+                streak_days = EXCLUDED.streak_days,
+                last_done_date = EXCLUDED.last_done_date,
+                updated_at = EXCLUDED.updated_at
+            """
+        ),
+        {
+            "couple_key": couple_key,
+            "habit_key": habit_key,
+            "user_email": user_email,
+            "streak_days": int(streak_days),
+            "last_done_date": last_done.isoformat() if last_done else None,
+            "updated_at": datetime.utcnow().isoformat(),
+        },
+    )
+
+
+async def _entries_watermark(session, user_email: str) -> str | None:
+    """Latest updated_at across a user's entries, whoever wrote them (API, Streamlit or web app)."""
+    return (await session.execute(
+        sql_text(f"SELECT MAX(updated_at) FROM {ENTRIES_TABLE} WHERE user_email = :user_email"),
+        {"user_email": user_email},
+    )).scalar()
+
+
+def _streak_row_is_stale(row, entries_watermark: str | None) -> bool:
+    # Writers outside the backend never touch the cache; any entry newer than the row invalidates it.
+    return bool(entries_watermark) and str(row["updated_at"] or "") < str(entries_watermark)
+
+
+async def _apply_streak_patch(
+    session,
+    user_email: str,
+    day_iso: str,
+    habit_patch: dict,
+    entries_watermark: str | None = None,
+) -> None:
+    day = _parse_entry_date(day_iso)
+    if day is None:
+        return
+    couple_key = _couple_key(user_email, get_partner_email(user_email))
+    profile = await get_user_settings(user_email)
+    meeting_days = profile.meeting_days
+    family_day = profile.family_worship_day
+    rows = (await session.execute(
+        sql_text(
+            f"""
+            SELECT habit_key, streak_days, last_done_date, updated_at
+            FROM {SHARED_STREAK_CACHE_TABLE}
+            WHERE couple_key = :couple_key AND user_email = :user_email AND habit_key IN :habit_keys
+            """
+        ).bindparams(bindparam("habit_keys", expanding=True)),
+        {"couple_key": couple_key, "user_email": user_email, "habit_keys": list(habit_patch.keys())},
+    )).mappings().all()
+    cached = {row["habit_key"]: row for row in rows if not _streak_row_is_stale(row, entries_watermark)}
+
+    for habit_key, value in habit_patch.items():
+        valid_weekdays = _habit_valid_weekdays(habit_key, meeting_days, family_day)
+        if valid_weekdays is not None and day.weekday() not in valid_weekdays:
+            continue
+        done = int(value or 0) == 1
+        state = cached.get(habit_key)
+        last_done = _parse_entry_date(state["last_done_date"]) if state and state["last_done_date"] else None
+        streak_days = int(state["streak_days"] or 0) if state else 0
+        if state is not None and last_done is not None:
+            # Fast paths: extending or ignoring the latest run needs no scan.
+            if not done and day > last_done:
+                continue
+            if done and day == last_done:
+                continue
+            if done and day > last_done:
+                if _previous_valid_day(day, valid_weekdays) == last_done:
+                    streak_days += 1
+                else:
+                    streak_days = 1
+                await _store_streak_state(session, couple_key, habit_key, user_email, day, streak_days)
+                continue
+        last_done, streak_days = await _scan_streak_state(session, user_email, habit_key, valid_weekdays)
+        await _store_streak_state(session, couple_key, habit_key, user_email, last_done, streak_days)
+
+    # This write is accounted for: rows that were current before it stay current, stale ones stay stale.
+    watermark_clause = "AND updated_at >= :watermark" if entries_watermark else ""
+    await session.execute(
+        sql_text(
+            f"""
+            UPDATE {SHARED_STREAK_CACHE_TABLE}
+            SET updated_at = :now
+            WHERE couple_key = :couple_key
+              AND user_email = :user_email
+              {watermark_clause}
+            """
+        ),
+        {
+            "now": datetime.utcnow().isoformat(),
+            "couple_key": couple_key,
+            "user_email": user_email,
+            "watermark": entries_watermark,
+        },
+    )
+
+
+async def refresh_shared_streaks(user_email: str, habit_keys: list[str] | None = None) -> None:
+    couple_key = _couple_key(user_email, get_partner_email(user_email))
+    profile = await get_user_settings(user_email)
+    meeting_days = profile.meeting_days
+    family_day = profile.family_worship_day
     session_factory = get_sessionmaker()
     async with session_factory() as session:
-        rows = (await session.execute(
+        for habit_key in habit_keys or HABIT_KEYS:
+            valid_weekdays = _habit_valid_weekdays(habit_key, meeting_days, family_day)
+            last_done, streak_days = await _scan_streak_state(session, user_email, habit_key, valid_weekdays)
+            await _store_streak_state(session, couple_key, habit_key, user_email, last_done, streak_days)
+        await session.commit()
+
+
+async def _load_streak_rows(today: date, user_a: str, user_b: str, habit_keys: list[str], couple_key: str):
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        today_rows = (await session.execute(
             sql_text(
                 f"""
-                SELECT user_email, date, {', '.join(habit_keys)}
+                SELECT user_email, {', '.join(habit_keys)}
                 FROM {ENTRIES_TABLE}
                 WHERE user_email IN (:user_a, :user_b)
-                  AND date <= :today
-                  AND date >= :start_date
-                ORDER BY date DESC
+                  AND date = :today
                 """
             ),
-            {
-                "user_a": user_a,
-                "user_b": user_b,
-                "today": today.isoformat(),
-                "start_date": start_window.isoformat(),
-            },
+            {"user_a": user_a, "user_b": user_b, "today": today.isoformat()},
         )).mappings().all()
+        watermarks = {email: await _entries_watermark(session, email) for email in (user_a, user_b)}
+        cache_rows = (await session.execute(
+            sql_text(
+                f"""
+                SELECT habit_key, user_email, streak_days, last_done_date, updated_at
+                FROM {SHARED_STREAK_CACHE_TABLE}
+                WHERE couple_key = :couple_key
+                  AND habit_key IN :habit_keys
+                """
+            ).bindparams(bindparam("habit_keys", expanding=True)),
+            {"couple_key": couple_key, "habit_keys": list(habit_keys)},
+        )).mappings().all()
+    return today_rows, [row for row in cache_rows if not _streak_row_is_stale(row, watermarks.get(row["user_email"]))]
 
-    by_user = {user_a: {}, user_b: {}}
-    for row in rows:
-        try:
-            row_date = date.fromisoformat(str(row.get("date")))
-        except Exception:
-            continue
-        by_user.setdefault(row["user_email"], {})[row_date] = dict(row)
-
-    async def habit_streak(habit_map, habit_key, valid_weekdays=None, include_today=True):
-        count = 0
-        current = today if include_today else today - timedelta(days=1)
-        while True:
-            if valid_weekdays is not None and current.weekday() not in valid_weekdays:
-                current = current - timedelta(days=1)
-                continue
-            row = habit_map.get(current)
-            if not row:
-                break
-            if int(row.get(habit_key, 0) or 0) != 1:
-                break
-            count += 1
-            current = current - timedelta(days=1)
-        return count
+
+async def get_shared_habit_comparison(today: date, user_a: str, user_b: str, habit_keys: list[str]) -> dict:
+    couple_key = _couple_key(user_a, user_b)
+    loaded = await load_concurrently(
+        profiles=get_user_settings_many([user_a, user_b]),
+        rows=_load_streak_rows(today, user_a, user_b, habit_keys, couple_key),
+    )
+    profiles = loaded["profiles"]
+    today_rows, cache_rows = loaded["rows"]
+    meeting_days = {email: set(profile.meeting_days) for email, profile in profiles.items()}
+    family_days = {email: profile.family_worship_day for email, profile in profiles.items()}
+    session_factory = get_sessionmaker()
+    async with session_factory() as session:
+        streak_state = {}
+        for row in cache_rows:
+            last_done = _parse_entry_date(row["last_done_date"]) if row["last_done_date"] else None
+            streak_state[(row["user_email"], row["habit_key"])] = (last_done, int(row["streak_days"] or 0))
+
+        backfilled = False
+        for email in (user_a, user_b):
+            for habit_key in habit_keys:
+                valid_weekdays = _habit_valid_weekdays(habit_key, meeting_days[email], family_days[email])
+                state = streak_state.get((email, habit_key))
+                if state is None:
+                    # Cold or stale cache: (re)seed it from the entries table.
+                    state = await _scan_streak_state(session, email, habit_key, valid_weekdays)
+                    await _store_streak_state(session, couple_key, habit_key, email, *state)
+                    backfilled = True
+                elif state[0] is not None and state[0] > today:
+                    # Entries exist after the requested day; evaluate the run as of today instead.
+                    state = await _scan_streak_state(
+                        session, email, habit_key, valid_weekdays, until_iso=today.isoformat()
+                    )
+                streak_state[(email, habit_key)] = state
+        if backfilled:
+            await session.commit()
+
+    today_by_user = {row["user_email"]: dict(row) for row in today_rows}
 
     habits = []
-    meeting_days = {
-        user_a: set(await get_meeting_days(user_a)),
-        user_b: set(await get_meeting_days(user_b)),
-    }
-    family_days = {
-        user_a: await get_family_worship_day(user_a),
-        user_b: await get_family_worship_day(user_b),
-    }
     for habit_key in habit_keys:
-        valid_a = None
-        valid_b = None
-        if habit_key in {"meeting_attended", "prepare_meeting"}:
-            valid_a = meeting_days[user_a]
-            valid_b = meeting_days[user_b]
-        elif habit_key == "family_worship":
-            valid_a = {family_days[user_a]}
-            valid_b = {family_days[user_b]}
-        a_today_row = by_user.get(user_a, {}).get(today, {})
-        b_today_row = by_user.get(user_b, {}).get(today, {})
+        valid_a = _habit_valid_weekdays(habit_key, meeting_days[user_a], family_days[user_a])
+        valid_b = _habit_valid_weekdays(habit_key, meeting_days[user_b], family_days[user_b])
+        a_today_row = today_by_user.get(user_a, {})
+        b_today_row = today_by_user.get(user_b, {})
         a_today_val = int(a_today_row.get(habit_key, 0) or 0)
         b_today_val = int(b_today_row.get(habit_key, 0) or 0)
 
-        a_expected_today = True
-        b_expected_today = True
-        if habit_key in {"meeting_attended", "prepare_meeting"}:
-            a_expected_today = today.weekday() in meeting_days[user_a]
-            b_expected_today = today.weekday() in meeting_days[user_b]
-        elif habit_key == "family_worship":
-            a_expected_today = today.weekday() == family_days[user_a]
-            b_expected_today = today.weekday() == family_days[user_b]
+        a_expected_today = valid_a is None or today.weekday() in valid_a
+        b_expected_today = valid_b is None or today.weekday() in valid_b
 
         a_include_today = a_expected_today and a_today_val == 1
         b_include_today = b_expected_today and b_today_val == 1
-        a_streak = await habit_streak(by_user.get(user_a, {}), habit_key, valid_a, include_today=a_include_today)
-        b_streak = await habit_streak(by_user.get(user_b, {}), habit_key, valid_b, include_today=b_include_today)
+        a_streak = _streak_days_for_today(
+            *streak_state[(user_a, habit_key)], today, valid_a, include_today=a_include_today
+        )
+        b_streak = _streak_days_for_today(
+            *streak_state[(user_b, habit_key)], today, valid_b, include_today=b_include_today
+        )
 
         habits.append(
             {
@@ -1027,8 +2323,8 @@ async def get_shared_habit_comparison(today: date, user_a: str, user_b: str, hab
     completed_both = 0
     completed_any = 0
     considered = 0
-    today_a = by_user.get(user_a, {}).get(today, {})
-    today_b = by_user.get(user_b, {}).get(today, {})
+    today_a = today_by_user.get(user_a, {})
+    today_b = today_by_user.get(user_b, {})
     user_a_meeting_today = today.weekday() in meeting_days[user_a]
     user_b_meeting_today = today.weekday() in meeting_days[user_b]
     user_a_family_today = today.weekday() == family_days[user_a]
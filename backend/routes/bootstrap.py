@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends
 
 from backend.auth import require_user_email
 from backend import repositories
+from backend.loader import load_concurrently
 
 router = APIRouter()
 
@@ -11,15 +12,18 @@ router = APIRouter()
 @router.get("/v1/bootstrap")
 async def bootstrap(user_email: str = Depends(require_user_email)):
     today_iso = __import__("datetime").date.today().isoformat()
-    today_entry = await repositories.get_day_entry(user_email, today_iso)
+    loaded = await load_concurrently(
+        today_entry=repositories.get_day_entry(user_email, today_iso),
+        pending_tasks=repositories.count_pending_tasks(user_email, today_iso),
+    )
     quick_indicators = {
-        "pending_tasks": await repositories.count_pending_tasks(user_email, today_iso),
+        "pending_tasks": loaded["pending_tasks"],
     }
     return {
         "user_email": user_email,
         "user_name": user_email.split("@")[0].title(),
         "allowed": True,
-        "today_snapshot": today_entry,
+        "today_snapshot": loaded["today_entry"],
         "quick_indicators": quick_indicators,
     }
 
@@ -27,18 +31,14 @@ async def bootstrap(user_email: str = Depends(require_user_email)):
 @router.get("/v1/init")
 async def init_payload(user_email: str = Depends(require_user_email)):
     today_iso = __import__("datetime").date.today().isoformat()
-    today_entry = await repositories.get_day_entry(user_email, today_iso)
-    pending_tasks = await repositories.count_pending_tasks(user_email, today_iso)
-    meeting_days = await repositories.get_meeting_days(user_email)
-    family_worship_day = await repositories.get_family_worship_day(user_email)
     partner = repositories.get_partner_email(user_email)
-    shared_snapshot = {
-        "today": today_iso,
-        "habits": [],
-        "summary": "Shared summary unavailable.",
+    calls = {
+        "today_entry": repositories.get_day_entry(user_email, today_iso),
+        "pending_tasks": repositories.count_pending_tasks(user_email, today_iso),
+        "profile": repositories.get_user_settings(user_email),
     }
     if partner:
-        shared_snapshot = await repositories.get_shared_habit_comparison(
+        calls["shared_snapshot"] = repositories.get_shared_habit_comparison(
             __import__("datetime").date.today(),
             user_email,
             partner,
@@ -52,14 +52,22 @@ async def init_payload(user_email: str = Depends(require_user_email)):
                 "family_worship",
             ],
         )
+    loaded = await load_concurrently(**calls)
+    shared_snapshot = loaded.get("shared_snapshot") or {
+        "today": today_iso,
+        "habits": [],
+        "summary": "Shared summary unavailable.",
+    }
+    pending_tasks = loaded["pending_tasks"]
+    profile = loaded["profile"]
     return {
         "user_email": user_email,
         "user_name": user_email.split("@")[0].title(),
         "allowed": True,
-        "today_snapshot": today_entry,
+        "today_snapshot": loaded["today_entry"],
         "quick_indicators": {"pending_tasks": pending_tasks},
         "pending_tasks": pending_tasks,
         "shared_snapshot": shared_snapshot,
-        "meeting_days": meeting_days,
-        "family_worship_day": family_worship_day,
+        "meeting_days": profile.meeting_days,
+        "family_worship_day": profile.family_worship_day,
     }
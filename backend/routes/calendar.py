@@ -1,14 +1,12 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta, timezone
+from datetime import date, timedelta
 
 from fastapi import APIRouter, Depends, Query
 
 from backend.auth import require_user_email
 from backend import repositories
-from backend.settings import get_settings
-from backend.services import google_calendar_service
-from backend.workers.sync_worker import process_outbox_once
+from backend.services import sync_jobs
 
 router = APIRouter()
 
@@ -37,28 +35,7 @@ async def calendar_week(start: date = Query(...), user_email: str = Depends(requ
     return {"start_date": start.isoformat(), "days": hour_rows}
 
 
-@router.post("/v1/calendar/sync/run")
+@router.post("/v1/calendar/sync/run", status_code=202)
 async def trigger_sync(user_email: str = Depends(require_user_email)):
-    settings = get_settings()
-    calendar_ids = ["primary"] + settings.allowed_calendar_ids(user_email)
-    now = datetime.now(timezone.utc)
-    time_min = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat().replace("+00:00", "Z")
-    time_max = (now + timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0).isoformat().replace("+00:00", "Z")
-
-    for calendar_id in calendar_ids:
-        cursor = await repositories.get_sync_cursor(user_email, calendar_id)
-        sync_token = cursor.get("sync_token") if cursor else None
-        response = await google_calendar_service.list_events(user_email, calendar_id, time_min, time_max, sync_token)
-        items = response.get("items") or []
-        for event in items:
-            if event.get("status") == "cancelled":
-                if event.get("id"):
-                    await repositories.delete_task_by_google_ids(user_email, calendar_id, event.get("id"))
-                continue
-            await repositories.upsert_google_task(user_email, calendar_id, event)
-        next_token = response.get("nextSyncToken")
-        await repositories.update_sync_cursor(user_email, calendar_id, next_token, None)
-
-    # If no background worker is running, drain a small batch of pending outbox items here.
-    drained = await process_outbox_once(limit=10)
-    return {"ok": True, "outbox_drained": drained}
+    job = await sync_jobs.start_calendar_sync_job(user_email)
+    return {"ok": True, "job_id": job["id"], "status": job["status"]}
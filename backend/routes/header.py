@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends
 
 from backend.auth import require_user_email
 from backend import repositories
+from backend.loader import load_concurrently
 from backend.settings import get_settings
 
 router = APIRouter()
@@ -31,17 +32,18 @@ async def header_snapshot(user_email: str = Depends(require_user_email)):
         today = datetime.now(ZoneInfo(tz_name)).date()
     except Exception:
         today = date.today()
-    pending_tasks = await repositories.count_pending_tasks(user_email, today.isoformat())
     partner = repositories.get_partner_email(user_email)
-    shared_snapshot = {
+    calls = {"pending_tasks": repositories.count_pending_tasks(user_email, today.isoformat())}
+    if partner:
+        calls["shared_snapshot"] = repositories.get_shared_habit_comparison(today, user_email, partner, SHARED_HABITS)
+    loaded = await load_concurrently(**calls)
+    shared_snapshot = loaded.get("shared_snapshot") or {
         "today": today.isoformat(),
         "habits": [],
         "summary": "Shared summary unavailable.",
     }
-    if partner:
-        shared_snapshot = await repositories.get_shared_habit_comparison(today, user_email, partner, SHARED_HABITS)
     return {
         "today": today.isoformat(),
-        "pending_tasks": pending_tasks,
+        "pending_tasks": loaded["pending_tasks"],
         "shared_snapshot": shared_snapshot,
     }
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from backend.auth import require_user_email
+from backend import repositories
+from backend.schemas import DaySnapshotsResponse
+
+router = APIRouter()
+
+
+@router.get("/v1/stats/day-snapshots", response_model=DaySnapshotsResponse)
+async def list_day_snapshots(
+    start: date = Query(...),
+    end: date = Query(...),
+    user_email: str = Depends(require_user_email),
+):
+    if end < start:
+        raise HTTPException(status_code=400, detail="End date must be after start date")
+    items = await repositories.list_day_snapshots(user_email, start.isoformat(), end.isoformat())
+    return {"items": items}
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 
 from backend.auth import require_user_email
 from backend import repositories
+from backend.schemas import OutboxReplayPayload
+from backend.services import google_calendar_service
 from backend.workers.sync_worker import process_outbox_once
 
 router = APIRouter()
@@ -22,4 +24,29 @@ async def sync_status(user_email: str = Depends(require_user_email)):
 @router.post("/v1/sync/run")
 async def run_sync_once(user_email: str = Depends(require_user_email)):
     drained = await process_outbox_once(limit=25)
-    return {"ok": True, "outbox_drained": drained}
+    retry_after = google_calendar_service.rate_limit_remaining(user_email)
+    return {"ok": True, "outbox_drained": drained, "retry_after": round(retry_after, 1) if retry_after else None}
+
+
+@router.get("/v1/sync/jobs/{job_id}")
+async def sync_job_status(job_id: str, user_email: str = Depends(require_user_email)):
+    job = await repositories.get_sync_job(user_email, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
+
+
+@router.get("/v1/sync/outbox/dead")
+async def list_dead_outbox(user_email: str = Depends(require_user_email)):
+    items = await repositories.list_dead_outbox(user_email)
+    return {"items": items}
+
+
+@router.post("/v1/sync/outbox/dead/replay")
+async def replay_dead_outbox(
+    payload: OutboxReplayPayload | None = None,
+    user_email: str = Depends(require_user_email),
+):
+    ids = payload.ids if payload else None
+    replayed = await repositories.replay_dead_outbox(user_email, ids)
+    return {"ok": True, "replayed": replayed}
@@ -5,8 +5,10 @@ from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.auth import require_user_email
+from backend.db import get_request_session
 from backend.schemas import TaskCreate, TaskPatch, TaskSchedule, SubtaskCreate, SubtaskPatch
 from backend import repositories
 
@@ -49,7 +51,11 @@ async def list_unscheduled_tasks(user_email: str = Depends(require_user_email)):
 
 
 @router.post("/v1/tasks")
-async def create_task(payload: TaskCreate, user_email: str = Depends(require_user_email)):
+async def create_task(
+    payload: TaskCreate,
+    user_email: str = Depends(require_user_email),
+    session: AsyncSession = Depends(get_request_session),
+):
     try:
         clean = _normalize_task_patch(payload.model_dump(exclude_unset=True))
         record = await repositories.create_task(
@@ -62,8 +68,10 @@ async def create_task(payload: TaskCreate, user_email: str = Depends(require_use
                 "estimated_minutes": clean.get("estimated_minutes") or payload.estimated_minutes,
                 "source": clean.get("source") or payload.source,
             },
+            session=session,
         )
-        await repositories.enqueue_outbox(user_email, "task", record["id"], "create", record)
+        await repositories.enqueue_outbox(user_email, "task", record["id"], "create", record, session=session)
+        await session.commit()
         return jsonable_encoder(record)
     except Exception as exc:
         logger.exception("Failed to create task: %s", exc)
@@ -71,11 +79,16 @@ async def create_task(payload: TaskCreate, user_email: str = Depends(require_use
 
 
 @router.patch("/v1/tasks/{task_id}")
-async def patch_task(task_id: str, payload: TaskPatch, user_email: str = Depends(require_user_email)):
+async def patch_task(
+    task_id: str,
+    payload: TaskPatch,
+    user_email: str = Depends(require_user_email),
+    session: AsyncSession = Depends(get_request_session),
+):
     try:
         patch = _normalize_task_patch(payload.model_dump(exclude_unset=True))
-        record = await repositories.update_task(user_email, task_id, patch)
-        await repositories.enqueue_outbox(user_email, "task", task_id, "update", patch)
+        record = await repositories.update_task_and_enqueue(user_email, task_id, patch, session=session)
+        await session.commit()
         return jsonable_encoder(record)
     except Exception as exc:
         logger.exception("Failed to update task: %s", exc)
@@ -83,11 +96,16 @@ async def patch_task(task_id: str, payload: TaskPatch, user_email: str = Depends
 
 
 @router.patch("/v1/tasks/{task_id}/schedule")
-async def schedule_task(task_id: str, payload: TaskSchedule, user_email: str = Depends(require_user_email)):
+async def schedule_task(
+    task_id: str,
+    payload: TaskSchedule,
+    user_email: str = Depends(require_user_email),
+    session: AsyncSession = Depends(get_request_session),
+):
     try:
         patch = _normalize_task_patch(payload.model_dump(exclude_unset=True))
-        record = await repositories.update_task(user_email, task_id, patch)
-        await repositories.enqueue_outbox(user_email, "task", task_id, "update", patch)
+        record = await repositories.update_task_and_enqueue(user_email, task_id, patch, session=session)
+        await session.commit()
         return jsonable_encoder(record)
     except Exception as exc:
         logger.exception("Failed to schedule task: %s", exc)
@@ -95,10 +113,14 @@ async def schedule_task(task_id: str, payload: TaskSchedule, user_email: str = D
 
 
 @router.delete("/v1/tasks/{task_id}")
-async def delete_task(task_id: str, user_email: str = Depends(require_user_email)):
+async def delete_task(
+    task_id: str,
+    user_email: str = Depends(require_user_email),
+    session: AsyncSession = Depends(get_request_session),
+):
     try:
-        record = await repositories.get_task(user_email, task_id)
-        await repositories.delete_task(user_email, task_id)
+        record = await repositories.get_task(user_email, task_id, session=session)
+        await repositories.delete_task(user_email, task_id, session=session)
         await repositories.enqueue_outbox(
             user_email,
             "task",
@@ -108,7 +130,9 @@ async def delete_task(task_id: str, user_email: str = Depends(require_user_email
                 "google_calendar_id": record.get("google_calendar_id"),
                 "google_event_id": record.get("google_event_id"),
             },
+            session=session,
         )
+        await session.commit()
         return {"ok": True}
     except Exception as exc:
         logger.exception("Failed to delete task: %s", exc)
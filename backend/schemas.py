@@ -153,6 +153,22 @@ class EntriesResponse(BaseModel):
     items: List[Dict[str, Any]]
 
 
+class DaySnapshot(BaseModel):
+    date: str
+    habits_completed: int
+    habits_total: int
+    habits_percent: float
+    life_balance_score: float
+
+
+class DaySnapshotsResponse(BaseModel):
+    items: List[DaySnapshot]
+
+
+class OutboxReplayPayload(BaseModel):
+    ids: Optional[List[str]] = None
+
+
 class HeaderSnapshotResponse(BaseModel):
     today: str
     pending_tasks: int
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from backend import repositories
+from backend.settings import get_settings
+from backend.services import google_calendar_service
+from backend.services.google_calendar_service import CalendarApiError
+
+logger = logging.getLogger(__name__)
+
+# Calendars of one user synced at once; each holds a Google connection and a DB session per page.
+CALENDAR_SYNC_CONCURRENCY = 3
+SYNC_WINDOW_DAYS = 7
+
+_INFLIGHT_USER_SYNCS: dict[str, asyncio.Task] = {}
+
+
+def _covered_dates(time_min: str, time_max: str, timezone_name: str) -> tuple[str, str]:
+    """Local dates [start, end) whose whole day lies inside the [time_min, time_max) instants.
+
+    Google filters the rescan by instants, so a partially covered edge day may hold events that were
+    simply not listed; those days are left out of the delete.
+    """
+    try:
+        tzinfo = ZoneInfo(timezone_name)
+    except Exception:
+        tzinfo = timezone.utc
+    local_min = datetime.fromisoformat(time_min.replace("Z", "+00:00")).astimezone(tzinfo)
+    local_max = datetime.fromisoformat(time_max.replace("Z", "+00:00")).astimezone(tzinfo)
+    start = local_min.date()
+    if local_min.time() != datetime.min.time():
+        start += timedelta(days=1)
+    return start.isoformat(), local_max.date().isoformat()
+
+
+async def _apply_pages(
+    user_email: str,
+    calendar_id: str,
+    time_min: str,
+    time_max: str,
+    sync_token: str | None,
+    page_token: str | None,
+    full_resync: bool = False,
+) -> dict:
+    stats = {
+        "calendar_id": calendar_id,
+        "pages": 0,
+        "upserted": 0,
+        "unchanged": 0,
+        "deleted": 0,
+        "full_resync": full_resync,
+    }
+    seen_event_ids: list[str] = []
+    window_min = None if sync_token else time_min
+    window_max = None if sync_token else time_max
+    pages = google_calendar_service.iter_event_pages(
+        user_email, calendar_id, time_min, time_max, sync_token, page_token
+    )
+    async for page in pages:
+        items = page.get("items") or []
+        cancelled_ids = [event.get("id") for event in items if event.get("status") == "cancelled"]
+        active_events = [event for event in items if event.get("status") != "cancelled"]
+        await repositories.delete_tasks_by_google_ids(user_email, calendar_id, cancelled_ids)
+        written = await repositories.upsert_google_tasks(user_email, calendar_id, active_events)
+        stats["upserted"] += written
+        stats["unchanged"] += len(active_events) - written
+        stats["deleted"] += len(cancelled_ids)
+        stats["pages"] += 1
+        if full_resync:
+            seen_event_ids.extend(event["id"] for event in active_events if event.get("id"))
+        next_page_token = page.get("nextPageToken")
+        if next_page_token:
+            # Keep the token we are paging under so an interrupted scan resumes from this page.
+            await repositories.update_sync_cursor(
+                user_email,
+                calendar_id,
+                sync_token,
+                None,
+                page_token=next_page_token,
+                window_min=window_min,
+                window_max=window_max,
+            )
+            continue
+        if full_resync:
+            timezone_name = await google_calendar_service.resolve_calendar_timezone(user_email, calendar_id)
+            start_date, end_date = _covered_dates(time_min, time_max, timezone_name)
+            stats["deleted"] += await repositories.delete_google_tasks_not_in(
+                user_email, calendar_id, seen_event_ids, start_date, end_date
+            )
+        await repositories.update_sync_cursor(user_email, calendar_id, page.get("nextSyncToken"), None)
+    return stats
+
+
+async def sync_calendar(user_email: str, calendar_id: str, time_min: str, time_max: str) -> dict:
+    """Stream one calendar's changes into todo_tasks page by page, resuming from google_sync_cursor."""
+    cursor = await repositories.get_sync_cursor(user_email, calendar_id) or {}
+    sync_token = cursor.get("sync_token")
+    page_token = cursor.get("page_token")
+    if page_token and not sync_token:
+        # An interrupted window scan must continue over the window its page token was issued for.
+        time_min = cursor.get("window_min") or time_min
+        time_max = cursor.get("window_max") or time_max
+    try:
+        try:
+            return await _apply_pages(user_email, calendar_id, time_min, time_max, sync_token, page_token)
+        except CalendarApiError as exc:
+            if exc.status_code == 410:
+                logger.info("Sync token expired for %s/%s; running a windowed full resync.", user_email, calendar_id)
+                await repositories.update_sync_cursor(user_email, calendar_id, None, None)
+                return await _apply_pages(user_email, calendar_id, time_min, time_max, None, None, full_resync=True)
+            if page_token and exc.status_code == 400:
+                # Stored page tokens can go stale; restart the scan from its first page.
+                return await _apply_pages(user_email, calendar_id, time_min, time_max, sync_token, None)
+            raise
+    except Exception as exc:
+        await repositories.set_sync_cursor_error(user_email, calendar_id, str(exc))
+        raise
+
+
+def _sync_window() -> tuple[str, str]:
+    now = datetime.now(timezone.utc)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    time_min = midnight.isoformat().replace("+00:00", "Z")
+    time_max = (midnight + timedelta(days=SYNC_WINDOW_DAYS)).isoformat().replace("+00:00", "Z")
+    return time_min, time_max
+
+
+async def _sync_user_calendars(user_email: str) -> list[dict]:
+    """Sync each calendar independently; a failing calendar is reported without cancelling the rest."""
+    calendar_ids = list(dict.fromkeys(["primary"] + get_settings().allowed_calendar_ids(user_email)))
+    time_min, time_max = _sync_window()
+    semaphore = asyncio.Semaphore(CALENDAR_SYNC_CONCURRENCY)
+
+    async def _sync_one(calendar_id: str) -> dict:
+        async with semaphore:
+            return await sync_calendar(user_email, calendar_id, time_min, time_max)
+
+    results = await asyncio.gather(
+        *(_sync_one(calendar_id) for calendar_id in calendar_ids), return_exceptions=True
+    )
+    stats = []
+    for calendar_id, result in zip(calendar_ids, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            logger.warning("Calendar sync failed for %s/%s: %s", user_email, calendar_id, result)
+            stats.append({"calendar_id": calendar_id, "error": str(result)})
+        else:
+            stats.append(result)
+    return stats
+
+
+async def sync_user_calendars(user_email: str) -> list[dict]:
+    """Sync every calendar of a user; overlapping calls for the same user share one in-flight run."""
+    key = user_email.lower()
+    task = _INFLIGHT_USER_SYNCS.get(key)
+    if task is None or task.done():
+        task = asyncio.ensure_future(_sync_user_calendars(user_email))
+        _INFLIGHT_USER_SYNCS[key] = task
+
+        def _forget(finished: asyncio.Task, key: str = key) -> None:
+            if _INFLIGHT_USER_SYNCS.get(key) is finished:
+                _INFLIGHT_USER_SYNCS.pop(key, None)
+
+        task.add_done_callback(_forget)
+    # Shield so one caller disconnecting does not cancel the run the others are waiting on.
+    return await asyncio.shield(task)
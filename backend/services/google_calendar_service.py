@@ -5,26 +5,67 @@ import hashlib
 import hmac
 import time
 import asyncio
+import email
+import json
 from datetime import datetime, timedelta, timezone
-from urllib.parse import urlencode, quote
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import AsyncIterator
+from urllib.parse import urlencode, quote, urlparse
+from uuid import uuid4
 
 import httpx
 from cryptography.fernet import Fernet
 
 from backend.settings import get_settings
 from backend import repositories
+from backend.circuit_breaker import CircuitBreaker
+from backend.http_client import get_http_client
 
 AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 TOKEN_URL = "https://oauth2.googleapis.com/token"
 CALENDAR_API = "https://www.googleapis.com/calendar/v3"
-_TOKEN_REFRESH_LOCK = asyncio.Lock()
+EVENTS_PAGE_SIZE = 250
+CALENDAR_BATCH_URL = "https://www.googleapis.com/batch/calendar/v3"
+BATCH_MAX_OPERATIONS = 50
+# Access tokens kept in-process as user_email -> (token, expires_at); the DB is only read on a cold
+# cache and written when a token is refreshed.
+_ACCESS_TOKEN_CACHE: dict[str, tuple[str, datetime]] = {}
+_TOKEN_REFRESH_LOCKS: dict[str, asyncio.Lock] = {}
+
+# Per-user token bucket in front of every Calendar API call; Google's own per-user limit is
+# enforced per minute, so a short burst is fine but sustained bursts get 403 rateLimitExceeded.
+GOOGLE_BUCKET_RATE = 5.0
+GOOGLE_BUCKET_BURST = 10.0
+RATE_LIMIT_DEFAULT_BACKOFF_SECONDS = 30
+RATE_LIMIT_MAX_BACKOFF_SECONDS = 900
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "quotaExceeded", "dailyLimitExceeded"}
+QUOTA_FLUSH_EVERY = 20
+QUOTA_FLUSH_SECONDS = 60
+_BUCKETS: dict[str, tuple[float, float]] = {}
+_BLOCKED_UNTIL: dict[str, float] = {}
+_RATE_LIMIT_STRIKES: dict[str, int] = {}
+# user_email -> {"day", "used", "pending", "flushed_at"}; "used" includes calls not yet flushed to the DB.
+_QUOTA_USAGE: dict[str, dict] = {}
+_QUOTA_LOCKS: dict[str, asyncio.Lock] = {}
+
+# One breaker per endpoint class: timeouts and 5xx trip it, anything Google answers (even 4xx) resets it.
+CALENDAR_BREAKER = CircuitBreaker("google_calendar")
+TOKEN_BREAKER = CircuitBreaker("google_oauth_token")
+
+CALENDAR_TIMEZONE_TTL_SECONDS = 7 * 24 * 3600
+# (user_email, calendar_id) -> (monotonic fetched time, timezone); persisted in google_sync_cursor.
+_CALENDAR_TIMEZONE_CACHE: dict[tuple[str, str], tuple[float, str]] = {}
+
+
+@lru_cache(maxsize=4)
+def _fernet_for_key(secret: str) -> Fernet:
+    digest = hashlib.sha256(secret.encode("utf-8")).digest()
+    return Fernet(base64.urlsafe_b64encode(digest))
 
 
 def _fernet() -> Fernet:
-    settings = get_settings()
-    digest = hashlib.sha256(settings.google_token_encryption_key.encode("utf-8")).digest()
-    key = base64.urlsafe_b64encode(digest)
-    return Fernet(key)
+    return _fernet_for_key(get_settings().google_token_encryption_key)
 
 
 def encrypt_token(value: str) -> str:
@@ -91,8 +132,7 @@ async def exchange_code_for_tokens(user_email: str, code: str) -> None:
         "redirect_uri": settings.calendar_redirect_uri,
         "grant_type": "authorization_code",
     }
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.post(TOKEN_URL, data=payload)
+    response = await _guarded_request(TOKEN_BREAKER, "POST", TOKEN_URL, data=payload)
     response.raise_for_status()
     token_data = response.json()
     refresh_token = token_data.get("refresh_token")
@@ -113,51 +153,115 @@ async def exchange_code_for_tokens(user_email: str, code: str) -> None:
         expires_at=expires_at,
         scope=scope,
     )
+    _cache_access_token(user_email, access_token, expires_at)
+
+
+def _parse_expires_at(value) -> datetime | None:
+    if not value:
+        return None
+    try:
+        expires_dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except Exception:
+        return None
+    if expires_dt.tzinfo is None:
+        expires_dt = expires_dt.replace(tzinfo=timezone.utc)
+    return expires_dt
+
+
+def _cache_access_token(user_email: str, access_token: str | None, expires_at) -> None:
+    expires_dt = _parse_expires_at(expires_at)
+    if access_token and expires_dt:
+        _ACCESS_TOKEN_CACHE[user_email.lower()] = (access_token, expires_dt)
+
+
+def _cached_access_token(user_email: str) -> str | None:
+    cached = _ACCESS_TOKEN_CACHE.get(user_email.lower())
+    if cached and cached[1] > datetime.now(timezone.utc):
+        return cached[0]
+    return None
+
+
+def invalidate_access_token(user_email: str) -> None:
+    # Keep the rejected token with an expired stamp so the DB copy of it is not trusted again.
+    cached = _ACCESS_TOKEN_CACHE.get(user_email.lower())
+    if cached:
+        _ACCESS_TOKEN_CACHE[user_email.lower()] = (cached[0], datetime.fromtimestamp(0, tz=timezone.utc))
+
+
+def _token_refresh_lock(user_email: str) -> asyncio.Lock:
+    key = user_email.lower()
+    lock = _TOKEN_REFRESH_LOCKS.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _TOKEN_REFRESH_LOCKS[key] = lock
+    return lock
+
+
+async def _guarded_request(breaker: CircuitBreaker, method: str, url: str, **kwargs) -> httpx.Response:
+    breaker.before_call()
+    try:
+        response = await get_http_client().request(method, url, **kwargs)
+    except httpx.TransportError as exc:
+        breaker.record_failure(f"{type(exc).__name__}: {exc}")
+        raise
+    except BaseException:
+        breaker.release_probe()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure(f"HTTP {response.status_code}")
+    else:
+        breaker.record_success()
+    return response
+
+
+def breaker_states() -> dict[str, dict]:
+    return {breaker.name: breaker.snapshot() for breaker in (CALENDAR_BREAKER, TOKEN_BREAKER)}
+
+
+async def _refresh_access_token(user_email: str, refresh_enc: str) -> str | None:
+    refresh_token = decrypt_token(refresh_enc)
+    settings = get_settings()
+    payload = {
+        "client_id": settings.calendar_client_id,
+        "client_secret": settings.calendar_client_secret,
+        "refresh_token": refresh_token,
+        "grant_type": "refresh_token",
+    }
+    response = await _guarded_request(TOKEN_BREAKER, "POST", TOKEN_URL, data=payload)
+    response.raise_for_status()
+    token_data = response.json()
+    access_token = token_data.get("access_token")
+    if not access_token:
+        return None
+    expires_in = int(token_data.get("expires_in", 3600) or 3600)
+    expires_at = (datetime.now(timezone.utc) + timedelta(seconds=expires_in - 30)).isoformat()
+    await repositories.update_google_access_token(user_email, access_token, expires_at, token_data.get("scope"))
+    _cache_access_token(user_email, access_token, expires_at)
+    return access_token
 
 
-async def _refresh_access_token(user_email: str) -> str | None:
-    async with _TOKEN_REFRESH_LOCK:
+async def get_access_token(user_email: str) -> str | None:
+    access_token = _cached_access_token(user_email)
+    if access_token:
+        return access_token
+    # Single flight per user: concurrent callers wait here and pick up the winner's token.
+    async with _token_refresh_lock(user_email):
+        access_token = _cached_access_token(user_email)
+        if access_token:
+            return access_token
         token_row = await repositories.get_google_tokens(user_email)
         if not token_row:
             return None
+        stale = _ACCESS_TOKEN_CACHE.get(user_email.lower())
+        if not stale or stale[0] != token_row.get("access_token"):
+            _cache_access_token(user_email, token_row.get("access_token"), token_row.get("expires_at"))
+            access_token = _cached_access_token(user_email)
+            if access_token:
+                return access_token
         refresh_enc = token_row.get("refresh_token_enc")
         if not refresh_enc:
             return None
-        refresh_token = decrypt_token(refresh_enc)
-        settings = get_settings()
-        payload = {
-            "client_id": settings.calendar_client_id,
-            "client_secret": settings.calendar_client_secret,
-            "refresh_token": refresh_token,
-            "grant_type": "refresh_token",
-        }
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.post(TOKEN_URL, data=payload)
-        response.raise_for_status()
-        token_data = response.json()
-        access_token = token_data.get("access_token")
-        if not access_token:
-            return None
-        expires_in = int(token_data.get("expires_in", 3600) or 3600)
-        expires_at = (datetime.now(timezone.utc) + timedelta(seconds=expires_in - 30)).isoformat()
-        await repositories.update_google_access_token(user_email, access_token, expires_at, token_data.get("scope"))
-        return access_token
-
-
-async def get_access_token(user_email: str) -> str | None:
-    token_row = await repositories.get_google_tokens(user_email)
-    if not token_row:
-        return None
-    access_token = token_row.get("access_token")
-    expires_at = token_row.get("expires_at")
-    if access_token and expires_at:
-        try:
-            expires_dt = datetime.fromisoformat(str(expires_at).replace("Z", "+00:00"))
-        except Exception:
-            expires_dt = None
-        if expires_dt and expires_dt > datetime.now(timezone.utc):
-            return access_token
-    return await _refresh_access_token(user_email)
+        return await _refresh_access_token(user_email, refresh_enc)
 
 
 async def _google_headers(user_email: str) -> dict:
@@ -167,43 +271,205 @@ async def _google_headers(user_email: str) -> dict:
     return {"Authorization": f"Bearer {access_token}"}
 
 
+class CalendarApiError(RuntimeError):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Calendar API error ({status_code}): {message}")
+        self.status_code = status_code
+
+
+class RateLimitedError(CalendarApiError):
+    def __init__(self, status_code: int, message: str, retry_after: float):
+        super().__init__(status_code, message)
+        self.retry_after = retry_after
+
+
+def rate_limit_remaining(user_email: str) -> float:
+    """Seconds until calls for this user may resume; 0 when not throttled."""
+    return max(0.0, _BLOCKED_UNTIL.get(user_email.lower(), 0.0) - time.monotonic())
+
+
+def throttled_users() -> list[str]:
+    now = time.monotonic()
+    return [user for user, until in _BLOCKED_UNTIL.items() if until > now]
+
+
+def _block_user(user_email: str, retry_after: float | None) -> float:
+    key = user_email.lower()
+    strikes = _RATE_LIMIT_STRIKES.get(key, 0) + 1
+    _RATE_LIMIT_STRIKES[key] = strikes
+    if retry_after is None:
+        retry_after = min(RATE_LIMIT_MAX_BACKOFF_SECONDS, RATE_LIMIT_DEFAULT_BACKOFF_SECONDS * 2 ** (strikes - 1))
+    _BLOCKED_UNTIL[key] = max(_BLOCKED_UNTIL.get(key, 0.0), time.monotonic() + retry_after)
+    return retry_after
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _is_rate_limited(status_code: int, body) -> bool:
+    if status_code == 429:
+        return True
+    if status_code != 403 or not isinstance(body, dict):
+        return False
+    errors = (body.get("error") or {}).get("errors") or []
+    return any(isinstance(item, dict) and item.get("reason") in RATE_LIMIT_REASONS for item in errors)
+
+
+async def _take_bucket_tokens(user_email: str, cost: int) -> None:
+    key = user_email.lower()
+    while True:
+        tokens, refreshed = _BUCKETS.get(key, (GOOGLE_BUCKET_BURST, time.monotonic()))
+        now = time.monotonic()
+        tokens = min(GOOGLE_BUCKET_BURST, tokens + (now - refreshed) * GOOGLE_BUCKET_RATE)
+        if tokens >= 1:
+            # A batch may take the bucket into debt; later callers wait it off.
+            _BUCKETS[key] = (tokens - cost, now)
+            return
+        _BUCKETS[key] = (tokens, now)
+        await asyncio.sleep((1 - tokens) / GOOGLE_BUCKET_RATE)
+
+
+async def _quota_entry(user_email: str) -> dict:
+    key = user_email.lower()
+    today = datetime.now(timezone.utc).date().isoformat()
+    entry = _QUOTA_USAGE.get(key)
+    if entry is not None and entry["day"] == today:
+        return entry
+    lock = _QUOTA_LOCKS.get(key)
+    if lock is None:
+        lock = _QUOTA_LOCKS[key] = asyncio.Lock()
+    # Loading the day's count awaits the DB; concurrent first calls must share one entry.
+    async with lock:
+        entry = _QUOTA_USAGE.get(key)
+        if entry is None or entry["day"] != today:
+            if entry is not None and entry["pending"]:
+                await repositories.add_google_quota_usage(user_email, entry["day"], entry["pending"])
+            used = await repositories.get_google_quota_usage(user_email, today)
+            entry = {"day": today, "used": used, "pending": 0, "flushed_at": time.monotonic()}
+            _QUOTA_USAGE[key] = entry
+    return entry
+
+
+async def _record_quota_usage(user_email: str, cost: int) -> None:
+    entry = await _quota_entry(user_email)
+    entry["used"] += cost
+    entry["pending"] += cost
+    if entry["pending"] >= QUOTA_FLUSH_EVERY or time.monotonic() - entry["flushed_at"] >= QUOTA_FLUSH_SECONDS:
+        pending, entry["pending"] = entry["pending"], 0
+        entry["flushed_at"] = time.monotonic()
+        await repositories.add_google_quota_usage(user_email, entry["day"], pending)
+
+
+async def flush_quota_usage() -> None:
+    for key, entry in list(_QUOTA_USAGE.items()):
+        if entry["pending"]:
+            pending, entry["pending"] = entry["pending"], 0
+            await repositories.add_google_quota_usage(key, entry["day"], pending)
+
+
+async def _throttle(user_email: str, cost: int) -> None:
+    remaining = rate_limit_remaining(user_email)
+    if remaining > 0:
+        raise RateLimitedError(429, "Google API throttled for this user", remaining)
+    entry = await _quota_entry(user_email)
+    budget = get_settings().google_daily_request_budget
+    if budget and entry["used"] + cost > budget:
+        now = datetime.now(timezone.utc)
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        retry_after = _block_user(user_email, (midnight - now).total_seconds())
+        raise RateLimitedError(429, "Daily Google request budget exhausted", retry_after)
+    await _take_bucket_tokens(user_email, cost)
+
+
+async def _send(user_email: str, method: str, url: str, headers: dict | None = None, cost: int = 1, **kwargs):
+    """Issue one Calendar API request through the breaker, the user's rate limiter and quota accounting."""
+    if CALENDAR_BREAKER.state == "open":
+        # Fail before spending bucket tokens or a token refresh on a call that cannot go out.
+        CALENDAR_BREAKER.before_call()
+    await _throttle(user_email, cost)
+    request_headers = await _google_headers(user_email)
+    request_headers.update(headers or {})
+    response = await _guarded_request(CALENDAR_BREAKER, method, url, headers=request_headers, **kwargs)
+    await _record_quota_usage(user_email, cost)
+    if response.status_code == 401:
+        invalidate_access_token(user_email)
+    if response.status_code in {403, 429}:
+        try:
+            body = response.json()
+        except Exception:
+            body = None
+        if _is_rate_limited(response.status_code, body):
+            retry_after = _block_user(user_email, _parse_retry_after(response.headers.get("Retry-After")))
+            raise RateLimitedError(response.status_code, "Google rate limit exceeded", retry_after)
+    elif response.status_code < 400:
+        _RATE_LIMIT_STRIKES.pop(user_email.lower(), None)
+    return response
+
+
 async def list_events(
     user_email: str,
     calendar_id: str,
     time_min: str,
     time_max: str,
     sync_token: str | None = None,
+    page_token: str | None = None,
 ) -> dict:
-    headers = await _google_headers(user_email)
     endpoint = f"{CALENDAR_API}/calendars/{quote(calendar_id, safe='')}/events"
+    # orderBy/timeMin/timeMax are rejected alongside syncToken, and Google only hands out
+    # nextSyncToken when the initial query can be replayed incrementally.
     params = {
         "singleEvents": "true",
-        "orderBy": "startTime",
-        "maxResults": 250,
+        "maxResults": EVENTS_PAGE_SIZE,
     }
     if sync_token:
         params["syncToken"] = sync_token
     else:
         params["timeMin"] = time_min
         params["timeMax"] = time_max
-    async with httpx.AsyncClient(timeout=8) as client:
-        response = await client.get(endpoint, headers=headers, params=params)
+    if page_token:
+        params["pageToken"] = page_token
+    response = await _send(user_email, "GET", endpoint, params=params)
     if response.status_code >= 400:
         try:
             payload = response.json()
             message = payload.get("error", {}).get("message") or payload.get("message") or response.text
         except Exception:
             message = response.text
-        raise RuntimeError(f"Calendar API error ({response.status_code}): {message}")
+        raise CalendarApiError(response.status_code, message)
     return response.json()
 
 
+async def iter_event_pages(
+    user_email: str,
+    calendar_id: str,
+    time_min: str,
+    time_max: str,
+    sync_token: str | None = None,
+    page_token: str | None = None,
+) -> AsyncIterator[dict]:
+    """Yield events.list pages one at a time, following nextPageToken until the final page."""
+    while True:
+        page = await list_events(user_email, calendar_id, time_min, time_max, sync_token, page_token)
+        yield page
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            return
+
+
 async def create_event(user_email: str, calendar_id: str, payload: dict) -> dict:
-    headers = await _google_headers(user_email)
-    headers["Content-Type"] = "application/json"
     endpoint = f"{CALENDAR_API}/calendars/{quote(calendar_id, safe='')}/events"
-    async with httpx.AsyncClient(timeout=8) as client:
-        response = await client.post(endpoint, headers=headers, json=payload)
+    response = await _send(user_email, "POST", endpoint, json=payload)
     if response.status_code >= 400:
         try:
             payload_err = response.json()
@@ -215,11 +481,8 @@ async def create_event(user_email: str, calendar_id: str, payload: dict) -> dict
 
 
 async def update_event(user_email: str, calendar_id: str, event_id: str, patch: dict) -> dict:
-    headers = await _google_headers(user_email)
-    headers["Content-Type"] = "application/json"
     endpoint = f"{CALENDAR_API}/calendars/{quote(calendar_id, safe='')}/events/{quote(event_id, safe='')}"
-    async with httpx.AsyncClient(timeout=8) as client:
-        response = await client.patch(endpoint, headers=headers, json=patch)
+    response = await _send(user_email, "PATCH", endpoint, json=patch)
     if response.status_code >= 400:
         try:
             payload_err = response.json()
@@ -231,19 +494,121 @@ async def update_event(user_email: str, calendar_id: str, event_id: str, patch:
 
 
 async def delete_event(user_email: str, calendar_id: str, event_id: str) -> None:
-    headers = await _google_headers(user_email)
     endpoint = f"{CALENDAR_API}/calendars/{quote(calendar_id, safe='')}/events/{quote(event_id, safe='')}"
-    async with httpx.AsyncClient(timeout=8) as client:
-        response = await client.delete(endpoint, headers=headers)
+    response = await _send(user_email, "DELETE", endpoint)
     if response.status_code not in {200, 204}:
         response.raise_for_status()
 
 
+def event_path(calendar_id: str, event_id: str | None = None) -> str:
+    """Request path (no host) of an events resource, as used inside batch parts."""
+    path = f"{urlparse(CALENDAR_API).path}/calendars/{quote(calendar_id, safe='')}/events"
+    if event_id:
+        path = f"{path}/{quote(event_id, safe='')}"
+    return path
+
+
+def _encode_batch(operations: list[dict], boundary: str) -> bytes:
+    parts = []
+    for index, operation in enumerate(operations):
+        lines = [
+            f"--{boundary}",
+            "Content-Type: application/http",
+            f"Content-ID: <item-{index}>",
+            "",
+            f"{operation['method']} {operation['path']} HTTP/1.1",
+        ]
+        body = operation.get("body")
+        if body is not None:
+            lines += ["Content-Type: application/json; charset=UTF-8", "", json.dumps(body, ensure_ascii=False)]
+        else:
+            lines += [""]
+        parts.append("\r\n".join(lines))
+    return ("\r\n".join(parts) + f"\r\n--{boundary}--\r\n").encode("utf-8")
+
+
+def _decode_batch(content_type: str, content: bytes) -> dict[int, dict]:
+    """Map each sub-response back to its operation index via Content-ID <response-item-N>."""
+    message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + content)
+    results: dict[int, dict] = {}
+    for part in message.get_payload() if message.is_multipart() else []:
+        content_id = str(part.get("Content-ID") or "").strip("<> ")
+        try:
+            index = int(content_id.rsplit("-", 1)[-1])
+        except ValueError:
+            continue
+        raw = part.get_payload(decode=True) or b""
+        text = raw.decode("utf-8", errors="replace").replace("\r\n", "\n")
+        head, _, body_text = text.partition("\n\n")
+        status_line = head.split("\n", 1)[0].split()
+        status_code = int(status_line[1]) if len(status_line) > 1 and status_line[1].isdigit() else 0
+        try:
+            body = json.loads(body_text) if body_text.strip() else None
+        except ValueError:
+            body = None
+        results[index] = {"status_code": status_code, "body": body}
+    return results
+
+
+async def _execute_batch_chunk(user_email: str, chunk: list[dict], batch_url: str | None) -> dict[str, dict]:
+    boundary = f"batch_{uuid4().hex}"
+    # Google counts every part of a batch against the user's rate and daily quota.
+    response = await _send(
+        user_email,
+        "POST",
+        batch_url or CALENDAR_BATCH_URL,
+        headers={"Content-Type": f"multipart/mixed; boundary={boundary}"},
+        cost=len(chunk),
+        content=_encode_batch(chunk, boundary),
+    )
+    if response.status_code >= 400:
+        raise CalendarApiError(response.status_code, response.text[:500])
+    decoded = _decode_batch(response.headers.get("Content-Type", ""), response.content)
+    results: dict[str, dict] = {}
+    # One throttled response is one strike however many of its parts were rejected.
+    retry_after = None
+    for index, operation in enumerate(chunk):
+        item = decoded.get(index) or {"status_code": 0, "body": None}
+        error = None
+        if _is_rate_limited(item["status_code"], item.get("body")):
+            if retry_after is None:
+                retry_after = _block_user(user_email, None)
+            item["retry_after"] = retry_after
+        if not 200 <= item["status_code"] < 300:
+            if item["status_code"] == 401:
+                invalidate_access_token(user_email)
+            body = item.get("body") or {}
+            message = body.get("error", {}).get("message") if isinstance(body, dict) else None
+            error = f"Google batch {operation['method']} failed ({item['status_code']}): {message or 'no response'}"
+        results[operation["id"]] = {**item, "error": error}
+    return results
+
+
+async def execute_batch(user_email: str, operations: list[dict], batch_url: str | None = None) -> dict[str, dict]:
+    """Send operations ({"id", "method", "path", "body"}) through Google's batch endpoint.
+
+    Requests go out BATCH_MAX_OPERATIONS at a time; the result maps each operation id to
+    {"status_code", "body", "error"}, where error is None for 2xx sub-responses. A chunk that
+    fails as a whole (429, 5xx, open breaker) only marks its own operations failed, so results
+    Google already applied for earlier chunks are kept.
+    """
+    results: dict[str, dict] = {}
+    for start in range(0, len(operations), BATCH_MAX_OPERATIONS):
+        chunk = operations[start : start + BATCH_MAX_OPERATIONS]
+        try:
+            results.update(await _execute_batch_chunk(user_email, chunk, batch_url))
+        except Exception as exc:
+            failed = {"status_code": getattr(exc, "status_code", 0), "body": None, "error": str(exc)}
+            # Throttling and an open breaker carry retry_after, so the rows wait without spending an attempt.
+            if getattr(exc, "retry_after", None) is not None:
+                failed["retry_after"] = exc.retry_after
+            results.update({operation["id"]: dict(failed) for operation in chunk})
+    return results
+
+
 async def get_calendar_timezone(user_email: str, calendar_id: str) -> str:
-    headers = await _google_headers(user_email)
     endpoint = f"{CALENDAR_API}/calendars/{quote(calendar_id, safe='')}"
-    async with httpx.AsyncClient(timeout=15) as client:
-        response = await client.get(endpoint, headers=headers)
+    response = await _send(user_email, "GET", endpoint)
     if response.status_code >= 400:
         try:
             payload_err = response.json()
@@ -258,12 +623,34 @@ async def get_calendar_timezone(user_email: str, calendar_id: str) -> str:
     return get_settings().calendar_timezone
 
 
+def _timezone_is_fresh(fetched_at) -> bool:
+    try:
+        fetched_dt = datetime.fromisoformat(str(fetched_at))
+    except Exception:
+        return False
+    return datetime.utcnow() - fetched_dt < timedelta(seconds=CALENDAR_TIMEZONE_TTL_SECONDS)
+
+
 async def resolve_calendar_timezone(user_email: str, calendar_id: str) -> str:
     settings = get_settings()
     user_tz = settings.user_timezone(user_email)
     if user_tz:
         return user_tz
+    cache_key = (user_email.lower(), calendar_id)
+    cached = _CALENDAR_TIMEZONE_CACHE.get(cache_key)
+    if cached and time.monotonic() - cached[0] < CALENDAR_TIMEZONE_TTL_SECONDS:
+        return cached[1]
+    stored = await repositories.get_stored_calendar_timezone(user_email, calendar_id)
+    if stored and _timezone_is_fresh(stored.get("timezone_fetched_at")):
+        _CALENDAR_TIMEZONE_CACHE[cache_key] = (time.monotonic(), stored["calendar_timezone"])
+        return stored["calendar_timezone"]
     try:
-        return await get_calendar_timezone(user_email, calendar_id)
+        tz_name = await get_calendar_timezone(user_email, calendar_id)
     except Exception:
+        # Prefer a stale stored zone over the global default when Google is unreachable.
+        if stored:
+            return stored["calendar_timezone"]
         return settings.calendar_timezone
+    _CALENDAR_TIMEZONE_CACHE[cache_key] = (time.monotonic(), tz_name)
+    await repositories.store_calendar_timezone(user_email, calendar_id, tz_name)
+    return tz_name
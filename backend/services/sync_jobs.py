@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from backend import repositories
+from backend.services import calendar_sync_service
+from backend.settings import get_settings
+from backend.workers.sync_worker import SYNC_JOB_STALE_AFTER, process_outbox_once
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_SYNC_JOB = "calendar_sync"
+
+# Background task group for sync jobs started by this process, keyed by job id.
+_JOB_TASKS: dict[str, asyncio.Task] = {}
+# user_email -> job record of the calendar sync currently running for that user.
+_ACTIVE_USER_JOBS: dict[str, dict] = {}
+
+
+async def _run_calendar_sync_job(job_id: str, user_email: str) -> None:
+    try:
+        await repositories.update_sync_job(job_id, "running", progress={"stage": "calendars"})
+        calendars = await calendar_sync_service.sync_user_calendars(user_email)
+        synced = sum(1 for calendar in calendars if not calendar.get("error"))
+        await repositories.update_sync_job(
+            job_id, "running", progress={"stage": "outbox", "calendars_synced": synced}
+        )
+        drained = 0
+        if not get_settings().embedded_outbox_worker:
+            # Without an embedded worker, drain a small batch of pending outbox items here.
+            drained = await process_outbox_once(limit=10)
+        await repositories.update_sync_job(
+            job_id,
+            "done",
+            progress={"stage": "done", "calendars_synced": synced, "calendars_failed": len(calendars) - synced},
+            result={"calendars": calendars, "outbox_drained": drained},
+        )
+    except asyncio.CancelledError:
+        await asyncio.shield(repositories.update_sync_job(job_id, "error", error="Cancelled before completion"))
+        raise
+    except Exception as exc:
+        logger.exception("Calendar sync job %s failed: %s", job_id, exc)
+        await repositories.update_sync_job(job_id, "error", error=str(exc))
+
+
+async def start_calendar_sync_job(user_email: str) -> dict:
+    """Queue a calendar sync for the user, or return the one already running in this process."""
+    key = user_email.lower()
+    active = _ACTIVE_USER_JOBS.get(key)
+    if active and active["id"] in _JOB_TASKS:
+        return active
+    job = await repositories.create_sync_job(user_email, CALENDAR_SYNC_JOB)
+    task = asyncio.create_task(_run_calendar_sync_job(job["id"], user_email))
+    _JOB_TASKS[job["id"]] = task
+    _ACTIVE_USER_JOBS[key] = job
+
+    def _forget(_: asyncio.Task, job_id: str = job["id"]) -> None:
+        _JOB_TASKS.pop(job_id, None)
+        if _ACTIVE_USER_JOBS.get(key, {}).get("id") == job_id:
+            _ACTIVE_USER_JOBS.pop(key, None)
+
+    task.add_done_callback(_forget)
+    return job
+
+
+async def reconcile_sync_jobs() -> None:
+    """Fail jobs left queued/running by a process that exited without finishing them."""
+    try:
+        failed = await repositories.fail_stale_sync_jobs(SYNC_JOB_STALE_AFTER)
+    except Exception as exc:
+        logger.warning("Sync job reconciliation failed: %s", exc)
+        return
+    if failed:
+        logger.info("Marked %d stale sync jobs as failed.", failed)
+
+
+async def shutdown_sync_jobs() -> None:
+    tasks = list(_JOB_TASKS.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
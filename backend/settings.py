@@ -25,6 +25,8 @@ class Settings(BaseSettings):
     calendar_redirect_uri: str | None = Field(None, alias="CALENDAR_REDIRECT_URI")
 
     redis_url: str | None = Field(None, alias="REDIS_URL")
+    embedded_outbox_worker: bool = Field(False, alias="EMBEDDED_OUTBOX_WORKER")
+    google_daily_request_budget: int = Field(50000, alias="GOOGLE_DAILY_REQUEST_BUDGET")
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
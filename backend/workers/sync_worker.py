@@ -2,13 +2,43 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
+import os
+import socket
+import time
 from datetime import datetime, timedelta
+from uuid import uuid4
 from zoneinfo import ZoneInfo
 
+from sqlalchemy import text as sql_text
+
 from backend import repositories
+from backend.circuit_breaker import CircuitOpenError
+from backend.db import get_engine
+from backend.http_client import close_http_client
+from backend.outbox_notify import get_outbox_wakeup, listen_for_outbox, listen_for_settings
 from backend.settings import get_settings
 from backend.services import google_calendar_service
 
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+# pg advisory lock key shared by the standalone worker and embedded API workers.
+OUTBOX_LEADER_LOCK_KEY = 4_815_162_342
+LEADER_RETRY_SECONDS = 30
+OUTBOX_DONE_RETENTION = timedelta(days=7)
+OUTBOX_CLEANUP_INTERVAL_SECONDS = 3600
+SYNC_JOB_RETENTION = timedelta(days=7)
+# Jobs update their row at every stage; one silent this long belongs to a process that died.
+SYNC_JOB_STALE_AFTER = timedelta(minutes=30)
+# Concurrent Google calls per user within one batch.
+GOOGLE_CALLS_PER_USER = 4
+# Below this many independent rows, plain requests beat a multipart batch round trip.
+BATCH_MIN_OPERATIONS = 3
+
+_embedded_task: asyncio.Task | None = None
+_embedded_stop: asyncio.Event | None = None
+
 
 def _build_event_payload(task: dict, timezone_name: str) -> dict:
     title = task.get("title") or "Untitled task"
@@ -38,83 +68,372 @@ def _build_event_payload(task: dict, timezone_name: str) -> dict:
     return {"summary": title}
 
 
-async def _handle_task_outbox(row: dict) -> None:
-    user_email = row["user_email"]
+def _task_operation(row: dict, task: dict, timezones: dict[str, str]) -> dict | None:
+    """Describe the Google call an outbox row needs, or None when there is nothing to send."""
     action = row["action"]
-    payload = json.loads(row.get("payload_json") or "{}")
-    task_id = row.get("entity_id")
-
     if action == "create":
-        task = await repositories.get_task(user_email, task_id)
         calendar_id = task.get("google_calendar_id") or "primary"
-        if not task.get("scheduled_date"):
-            return
-        if task.get("google_event_id"):
-            return
-        tz_name = await google_calendar_service.resolve_calendar_timezone(user_email, calendar_id)
-        event = await google_calendar_service.create_event(
-            user_email,
-            calendar_id,
-            _build_event_payload(task, tz_name),
-        )
-        await repositories.update_task(
-            user_email,
-            task_id,
-            {"google_calendar_id": calendar_id, "google_event_id": event.get("id")},
-        )
-        return
-
+        if not task.get("scheduled_date") or task.get("google_event_id"):
+            return None
+        return {
+            "id": row["id"],
+            "action": action,
+            "calendar_id": calendar_id,
+            "method": "POST",
+            "path": google_calendar_service.event_path(calendar_id),
+            "body": _build_event_payload(task, timezones[calendar_id]),
+        }
     if action == "update":
-        task = await repositories.get_task(user_email, task_id)
         calendar_id = task.get("google_calendar_id") or "primary"
         event_id = task.get("google_event_id")
+        if not event_id or not task.get("scheduled_date"):
+            return None
+        return {
+            "id": row["id"],
+            "action": action,
+            "calendar_id": calendar_id,
+            "event_id": event_id,
+            "method": "PATCH",
+            "path": google_calendar_service.event_path(calendar_id, event_id),
+            "body": _build_event_payload(task, timezones[calendar_id]),
+        }
+    if action == "delete":
+        payload = json.loads(row.get("payload_json") or "{}")
+        calendar_id = payload.get("google_calendar_id") or "primary"
+        event_id = payload.get("google_event_id")
         if not event_id:
-            return
-        if not task.get("scheduled_date"):
-            return
-        tz_name = await google_calendar_service.resolve_calendar_timezone(user_email, calendar_id)
-        await google_calendar_service.update_event(
-            user_email,
-            calendar_id,
-            event_id,
-            _build_event_payload(task, tz_name),
+            return None
+        return {
+            "id": row["id"],
+            "action": action,
+            "calendar_id": calendar_id,
+            "event_id": event_id,
+            "method": "DELETE",
+            "path": google_calendar_service.event_path(calendar_id, event_id),
+            "body": None,
+        }
+    return None
+
+
+def _event_link(calendar_id: str, event: dict | None, event_id: str | None = None) -> dict:
+    event = event or {}
+    return {
+        "google_calendar_id": calendar_id,
+        "google_event_id": event.get("id") or event_id,
+        # Same fallback as the sync side, so the next incremental sync sees this write as unchanged.
+        "google_etag": event.get("etag") or event.get("updated"),
+    }
+
+
+async def _handle_task_outbox(row: dict, task: dict, timezones: dict[str, str]) -> dict | None:
+    """Apply one task outbox row to Google; return the event link to store after a create or update."""
+    user_email = row["user_email"]
+    operation = _task_operation(row, task, timezones)
+    if operation is None:
+        return None
+    calendar_id = operation["calendar_id"]
+    if operation["action"] == "create":
+        event = await google_calendar_service.create_event(user_email, calendar_id, operation["body"])
+        return _event_link(calendar_id, event)
+    if operation["action"] == "update":
+        event = await google_calendar_service.update_event(
+            user_email, calendar_id, operation["event_id"], operation["body"]
         )
+        return _event_link(calendar_id, event, operation["event_id"])
+    await google_calendar_service.delete_event(user_email, calendar_id, operation["event_id"])
+    return None
+
+
+async def _drain_batched(user_email: str, rows: list[dict], tasks: dict[str, dict], timezones: dict, outcome: dict) -> None:
+    """Send single-row task changes through one Google batch request and map results back per row."""
+    operations = []
+    rows_by_id = {row["id"]: row for row in rows}
+    for row in rows:
+        try:
+            operation = _task_operation(row, tasks.setdefault(row["entity_id"], {}), timezones)
+        except Exception as exc:
+            outcome["failed"].append(_retry_after(row, exc))
+            continue
+        if operation is None:
+            outcome["done"].append(row["id"])
+        else:
+            operations.append(operation)
+    if not operations:
         return
+    try:
+        results = await google_calendar_service.execute_batch(user_email, operations)
+    except Exception as exc:
+        outcome["failed"].extend(_retry_after(rows_by_id[operation["id"]], exc) for operation in operations)
+        return
+    links = []
+    for operation in operations:
+        row = rows_by_id[operation["id"]]
+        result = results.get(operation["id"]) or {"error": "Missing batch response"}
+        if result.get("retry_after") is not None:
+            throttled = google_calendar_service.RateLimitedError(
+                result.get("status_code") or 429, result.get("error") or "Google rate limit exceeded", result["retry_after"]
+            )
+            outcome["failed"].append(_retry_after(row, throttled))
+            continue
+        if result.get("error"):
+            outcome["failed"].append(_retry_after(row, RuntimeError(result["error"])))
+            continue
+        if operation["action"] in {"create", "update"}:
+            body = result.get("body") if isinstance(result.get("body"), dict) else None
+            link = _event_link(operation["calendar_id"], body, operation.get("event_id"))
+            links.append((row, {"user_email": user_email, "id": row["entity_id"], **link}))
+            continue
+        outcome["done"].append(row["id"])
+    if not links:
+        return
+    try:
+        # Store links and etags before anything else can fail so a crash never re-creates these events.
+        await repositories.save_task_event_links([link for _, link in links])
+    except Exception as exc:
+        outcome["failed"].extend(_retry_after(row, exc) for row, _ in links)
+        return
+    outcome["done"].extend(row["id"] for row, _ in links)
 
-    if action == "delete":
-        calendar_id = payload.get("google_calendar_id") or "primary"
-        event_id = payload.get("google_event_id")
-        if event_id:
-            await google_calendar_service.delete_event(user_email, calendar_id, event_id)
+
+def _retry_after(row: dict, exc: Exception) -> dict:
+    if isinstance(exc, (google_calendar_service.RateLimitedError, CircuitOpenError)):
+        # Throttling or an open breaker is not the row's fault: wait it out without spending an attempt.
+        return {
+            "id": row["id"],
+            "attempts": int(row.get("attempts") or 0),
+            "next_retry_at": (datetime.utcnow() + timedelta(seconds=exc.retry_after)).isoformat(),
+            "last_error": str(exc),
+        }
+    attempts = int(row.get("attempts") or 0) + 1
+    delay = min(300, 2 ** min(attempts, 8))
+    return {
+        "id": row["id"],
+        "attempts": attempts,
+        "next_retry_at": (datetime.utcnow() + timedelta(seconds=delay)).isoformat(),
+        "last_error": str(exc),
+    }
+
+
+async def _prepare_user(user_email: str, rows: list[dict], tasks: dict[str, dict]) -> dict[str, str]:
+    """Warm the user's access token and resolve each calendar's timezone once for the batch."""
+    needs_event_payload = [row for row in rows if row["action"] in {"create", "update"}]
+    if not needs_event_payload:
+        return {}
+    try:
+        await google_calendar_service.get_access_token(user_email)
+    except Exception as exc:
+        logger.debug("Token warm-up failed for %s: %s", user_email, exc)
+    calendar_ids = {
+        (tasks.get(row["entity_id"]) or {}).get("google_calendar_id") or "primary" for row in needs_event_payload
+    }
+    return {
+        calendar_id: await google_calendar_service.resolve_calendar_timezone(user_email, calendar_id)
+        for calendar_id in sorted(calendar_ids)
+    }
+
+
+async def _drain_user(user_email: str, rows: list[dict], tasks: dict[str, dict], outcome: dict) -> None:
+    timezones = await _prepare_user(user_email, rows, tasks)
+    semaphore = asyncio.Semaphore(GOOGLE_CALLS_PER_USER)
+
+    async def _run_row(row: dict) -> None:
+        try:
+            if row.get("entity_type") == "task":
+                task = tasks.setdefault(row["entity_id"], {})
+                async with semaphore:
+                    link = await _handle_task_outbox(row, task, timezones)
+                if link:
+                    await repositories.save_task_event_links(
+                        [{"user_email": user_email, "id": row["entity_id"], **link}]
+                    )
+            outcome["done"].append(row["id"])
+        except Exception as exc:
+            outcome["failed"].append(_retry_after(row, exc))
+
+    async def _run_batch(batch_rows: list[dict]) -> None:
+        async with semaphore:
+            await _drain_batched(user_email, batch_rows, tasks, timezones, outcome)
+
+    # claim_outbox_batch hands out at most one row per entity, so task rows are independent and
+    # can share one batch request once there are enough of them.
+    task_rows = [row for row in rows if row.get("entity_type") == "task"]
+    runs = []
+    if len(task_rows) >= BATCH_MIN_OPERATIONS:
+        runs.append(_run_batch(task_rows))
+        rows = [row for row in rows if row.get("entity_type") != "task"]
+    runs.extend(_run_row(row) for row in rows)
+    await asyncio.gather(*runs)
 
 
 async def process_outbox_once(limit: int = 25) -> int:
-    rows = await repositories.list_pending_outbox(limit=limit)
+    if google_calendar_service.CALENDAR_BREAKER.retry_after() > 0:
+        # Google is down: leave the backlog parked rather than leasing rows only to fail them.
+        return 0
+    # A fresh token per batch keeps a stale drain from finishing rows another drain reclaimed.
+    claim_token = f"{WORKER_ID}:{uuid4().hex[:8]}"
+    rows = await repositories.claim_outbox_batch(
+        limit=limit,
+        claimed_by=claim_token,
+        exclude_users=google_calendar_service.throttled_users(),
+    )
     if not rows:
         return 0
+    task_ids = [row["entity_id"] for row in rows if row.get("entity_type") == "task" and row.get("entity_id")]
+    tasks = await repositories.get_tasks_by_ids(task_ids)
+    by_user: dict[str, list[dict]] = {}
     for row in rows:
-        try:
-            if row.get("entity_type") == "task":
-                await _handle_task_outbox(row)
-            await repositories.mark_outbox_done(row["id"])
-        except Exception as exc:
-            attempts = int(row.get("attempts") or 0) + 1
-            delay = min(300, 2 ** min(attempts, 8))
-            next_retry_at = (datetime.utcnow() + timedelta(seconds=delay)).isoformat()
-            await repositories.mark_outbox_error(row["id"], attempts, next_retry_at, str(exc))
+        by_user.setdefault(row["user_email"], []).append(row)
+    outcome: dict[str, list] = {"done": [], "failed": []}
+    drains = []
+    for user_email, user_rows in by_user.items():
+        user_tasks = {task_id: dict(task) for task_id, task in tasks.items() if task.get("user_email") == user_email}
+        drains.append(_drain_user(user_email, user_rows, user_tasks, outcome))
+    results = await asyncio.gather(*drains, return_exceptions=True)
+    settled = set(outcome["done"]) | {failure["id"] for failure in outcome["failed"]}
+    for user_rows, result in zip(by_user.values(), results):
+        if not isinstance(result, BaseException):
+            continue
+        # A drain that blew up (e.g. in _prepare_user) fails its unsettled rows instead of leaving them leased.
+        logger.warning("Outbox drain failed for %s: %s", user_rows[0]["user_email"], result)
+        error = result if isinstance(result, Exception) else RuntimeError(repr(result))
+        outcome["failed"].extend(_retry_after(row, error) for row in user_rows if row["id"] not in settled)
+    await repositories.complete_outbox_batch(claim_token, outcome["done"], outcome["failed"])
     return len(rows)
 
 
-async def run_forever() -> None:
+async def _drain_loop(limit: int, stop_event: asyncio.Event, still_leader=None) -> None:
+    # Wake-ups (NOTIFY on Postgres, an in-process event otherwise) drive the loop; the
+    # backoff sleep is only a fallback for missed signals and rows waiting on next_retry_at.
+    wakeup = get_outbox_wakeup()
     sleep_for = 5
-    while True:
-        processed = await process_outbox_once(limit=25)
-        if processed == 0:
+    last_cleanup = 0.0
+    while not stop_event.is_set():
+        if still_leader is not None and not await still_leader():
+            logger.warning("Lost outbox leader connection; stepping down.")
+            return
+        if time.monotonic() - last_cleanup >= OUTBOX_CLEANUP_INTERVAL_SECONDS:
+            last_cleanup = time.monotonic()
+            try:
+                await repositories.purge_done_outbox(OUTBOX_DONE_RETENTION)
+                await repositories.fail_stale_sync_jobs(SYNC_JOB_STALE_AFTER)
+                await repositories.purge_finished_sync_jobs(SYNC_JOB_RETENTION)
+            except Exception as exc:
+                logger.warning("Outbox cleanup failed: %s", exc)
+        wakeup.clear()
+        try:
+            processed = await process_outbox_once(limit=limit)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # A failed pass (e.g. the database is briefly unreachable) must not end the worker.
+            logger.exception("Outbox drain pass failed: %s", exc)
+            sleep_for = min(60, sleep_for * 2)
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=sleep_for)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        if processed >= limit:
+            continue
+        parked_for = google_calendar_service.CALENDAR_BREAKER.retry_after()
+        if parked_for > 0:
+            sleep_for = parked_for
+        elif processed == 0:
             sleep_for = min(60, sleep_for * 2)
         else:
             sleep_for = 5
-        await asyncio.sleep(sleep_for)
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=sleep_for)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _connection_alive(conn) -> bool:
+    try:
+        await conn.execute(sql_text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+
+async def run_forever(limit: int = 25, stop_event: asyncio.Event | None = None) -> None:
+    """Drain the outbox until stop_event is set; on Postgres only the advisory-lock holder drains."""
+    stop_event = stop_event or asyncio.Event()
+    listener = asyncio.create_task(listen_for_outbox(get_outbox_wakeup()))
+    try:
+        engine = get_engine()
+        if engine.dialect.name != "postgresql":
+            await _drain_loop(limit, stop_event)
+            return
+        while not stop_event.is_set():
+            try:
+                async with engine.connect() as conn:
+                    # Session-level lock: held as long as this connection lives, released if it dies.
+                    conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    acquired = await conn.scalar(
+                        sql_text("SELECT pg_try_advisory_lock(:key)"), {"key": OUTBOX_LEADER_LOCK_KEY}
+                    )
+                    if acquired:
+                        logger.info("Outbox worker %s elected leader.", WORKER_ID)
+                        try:
+                            await _drain_loop(limit, stop_event, still_leader=lambda: _connection_alive(conn))
+                        finally:
+                            try:
+                                await conn.execute(
+                                    sql_text("SELECT pg_advisory_unlock(:key)"), {"key": OUTBOX_LEADER_LOCK_KEY}
+                                )
+                            except Exception:
+                                pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Outbox leader election failed: %s", exc)
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=LEADER_RETRY_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+
+
+def start_embedded_worker(limit: int = 25) -> None:
+    global _embedded_task, _embedded_stop
+    if _embedded_task is not None and not _embedded_task.done():
+        return
+    _embedded_stop = asyncio.Event()
+    _embedded_task = asyncio.create_task(run_forever(limit=limit, stop_event=_embedded_stop))
+
+
+async def stop_embedded_worker(timeout: float = 10.0) -> None:
+    """Let the current batch finish, then stop; cancel if it overruns the timeout."""
+    global _embedded_task, _embedded_stop
+    task, stop_event = _embedded_task, _embedded_stop
+    _embedded_task = None
+    _embedded_stop = None
+    if task is None or stop_event is None:
+        return
+    stop_event.set()
+    get_outbox_wakeup().set()
+    try:
+        await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+    except asyncio.TimeoutError:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    except Exception as exc:
+        logger.warning("Embedded outbox worker exited with error: %s", exc)
+
+
+async def _main() -> None:
+    settings_listener = asyncio.create_task(listen_for_settings(repositories.invalidate_user_settings_cache))
+    try:
+        await run_forever()
+    finally:
+        settings_listener.cancel()
+        await asyncio.gather(settings_listener, return_exceptions=True)
+        await google_calendar_service.flush_quota_usage()
+        await close_http_client()
 
 
 if __name__ == "__main__":
-    asyncio.run(run_forever())
+    asyncio.run(_main())
@@ -43,7 +43,6 @@ CUSTOMIZABLE_HABIT_KEYS = [
     key for key, _ in HABITS if key not in FIXED_COUPLE_HABIT_KEYS
 ]
 CUSTOM_HABITS_SETTING_KEY = "custom_habits"
-CUSTOM_HABIT_DONE_PREFIX = "custom_habit_done::"
 
 ENTRY_DATA_COLUMNS = [h[0] for h in HABITS] + [
     "sleep_hours",
@@ -58,6 +57,7 @@ ENTRY_COLUMNS = ["date"] + ENTRY_DATA_COLUMNS
 ENTRIES_TABLE = "daily_entries_user"
 LEGACY_ENTRIES_TABLE = "daily_entries"
 TASKS_TABLE = "todo_tasks"
+CUSTOM_HABIT_DONE_TABLE = "custom_habit_done"
 SUBTASKS_TABLE = "todo_subtasks"
 CALENDAR_STATUS_TABLE = "calendar_event_status"
 PROMPT_CARDS_TABLE = "partner_prompt_cards"
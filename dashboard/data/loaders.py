@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import logging
 import re
 from datetime import date, datetime, timedelta
@@ -14,7 +13,7 @@ if TYPE_CHECKING:  # pragma: no cover
     import pandas as pd
 
 from dashboard.constants import (
-    CUSTOM_HABIT_DONE_PREFIX,
+    CUSTOM_HABIT_DONE_TABLE,
     ENTRY_COLUMNS,
     ENTRIES_TABLE,
     HABITS,
@@ -182,37 +181,57 @@ def load_custom_habit_done_by_date_cached(user_email, database_url, start_iso, e
             return {}
 
     engine = get_engine(database_url)
-    key_prefix = f"{user_email}::{CUSTOM_HABIT_DONE_PREFIX}"
-    like_expr = f"{key_prefix}%"
     with engine.connect() as conn:
         rows = conn.execute(
-            sql_text("SELECT key, value FROM settings WHERE key LIKE :key_like"),
-            {"key_like": like_expr},
+            sql_text(
+                f"SELECT date, habit_id, done FROM {CUSTOM_HABIT_DONE_TABLE} "
+                "WHERE user_email = :user_email AND date BETWEEN :start_date AND :end_date"
+            ),
+            {"user_email": user_email, "start_date": start_iso, "end_date": end_iso},
         ).fetchall()
     done_by_date = {}
     for row in rows:
-        full_key, raw_value = row[0], row[1]
-        if not full_key:
-            continue
-        date_part = str(full_key).split(CUSTOM_HABIT_DONE_PREFIX, 1)[-1]
-        if not (start_iso <= date_part <= end_iso):
-            continue
         try:
-            day = date.fromisoformat(date_part)
+            day = date.fromisoformat(str(row[0])[:10])
         except Exception:
             continue
+        habit_id = str(row[1])
+        if not _sanitize_habit_name(habit_id):
+            continue
+        done_by_date.setdefault(day, {})[habit_id] = int(bool(row[2]))
+    return done_by_date
+
+
+@st.cache_data(ttl=120, show_spinner=False)
+def load_day_snapshots_cached(user_email, api_base, start_iso, end_iso):
+    if not repositories.api_enabled():
+        return {}
+    try:
+        payload = api_client.request(
+            "GET",
+            "/v1/stats/day-snapshots",
+            params={"start": start_iso, "end": end_iso},
+        )
+    except Exception as exc:
+        logger.warning("Failed to fetch day snapshots: %s", exc)
+        return {}
+    snapshots = {}
+    for item in payload.get("items", []):
         try:
-            parsed = json.loads(raw_value or "{}")
+            day = date.fromisoformat(str(item.get("date"))[:10])
         except Exception:
-            parsed = {}
-        if not isinstance(parsed, dict):
-            parsed = {}
-        done_by_date[day] = {
-            str(habit_id): int(bool(value))
-            for habit_id, value in parsed.items()
-            if _sanitize_habit_name(habit_id)
-        }
-    return done_by_date
+            continue
+        snapshots[day] = item
+    return snapshots
+
+
+def load_day_snapshots(start_date, end_date):
+    return load_day_snapshots_cached(
+        get_current_user_email(),
+        api_client.api_base_url(),
+        start_date.isoformat(),
+        end_date.isoformat(),
+    )
 
 
 @st.cache_data(ttl=15, show_spinner=False)
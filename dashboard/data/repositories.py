@@ -16,6 +16,7 @@ SETTINGS_TABLE = "settings"
 PROMPT_CARDS_TABLE = "partner_prompt_cards"
 PROMPT_ANSWERS_TABLE = "partner_prompt_answers"
 GOOGLE_TOKENS_TABLE = "google_calendar_tokens"
+CUSTOM_HABIT_DONE_TABLE = "custom_habit_done"
 
 CUSTOM_HABITS_SETTING_KEY = "custom_habits"
 
@@ -441,23 +442,23 @@ def delete_habit(user_email, habit_id):
 
 
 def get_custom_habit_done(user_email, day):
+    day_iso = day.isoformat() if isinstance(day, date) else str(day)
     if api_client.is_enabled():
-        day_iso = day.isoformat() if isinstance(day, date) else str(day)
         try:
             payload = api_client.request("GET", f"/v1/habits/custom/done/{day_iso}")
             return payload.get("done") or {}
         except Exception:
             return {}
-    raw = get_setting(user_email, f"custom_habit_done::{day.isoformat()}")
-    if not raw:
-        return {}
-    try:
-        payload = json.loads(raw)
-    except Exception:
-        payload = {}
-    if not isinstance(payload, dict):
-        payload = {}
-    return {str(k): int(bool(v)) for k, v in payload.items()}
+    engine = _engine()
+    with engine.connect() as conn:
+        rows = conn.execute(
+            sql_text(
+                f"SELECT habit_id, done FROM {CUSTOM_HABIT_DONE_TABLE} "
+                "WHERE user_email = :user_email AND date = :date"
+            ),
+            {"user_email": user_email, "date": day_iso},
+        ).fetchall()
+    return {str(row[0]): int(bool(row[1])) for row in rows}
 
 
 def set_custom_habit_done(user_email, day, done_map):
@@ -467,12 +468,25 @@ def set_custom_habit_done(user_email, day, done_map):
         _fire_and_forget_api("PUT", f"/v1/habits/custom/done/{day_iso}", json_payload={"done": clean})
         _invalidate(["habits", "entries"])
         return
-    set_setting(
-        user_email,
-        f"custom_habit_done::{day_iso}",
-        json.dumps(clean, ensure_ascii=False),
-        invalidate_domains=["habits", "entries"],
-    )
+    now = datetime.utcnow().isoformat()
+    engine = _engine()
+    with engine.begin() as conn:
+        conn.execute(
+            sql_text(f"DELETE FROM {CUSTOM_HABIT_DONE_TABLE} WHERE user_email = :user_email AND date = :date"),
+            {"user_email": user_email, "date": day_iso},
+        )
+        if clean:
+            conn.execute(
+                sql_text(
+                    f"INSERT INTO {CUSTOM_HABIT_DONE_TABLE} (user_email, date, habit_id, done, updated_at) "
+                    "VALUES (:user_email, :date, :habit_id, :done, :updated_at)"
+                ),
+                [
+                    {"user_email": user_email, "date": day_iso, "habit_id": habit_id, "done": done, "updated_at": now}
+                    for habit_id, done in clean.items()
+                ],
+            )
+    _invalidate(["habits", "entries"])
 
 
 def list_custom_habit_done_range(user_email, start_day, end_day):
@@ -484,7 +498,19 @@ def list_custom_habit_done_range(user_email, start_day, end_day):
             return payload.get("items", {})
         except Exception:
             return {}
-    return {}
+    engine = _engine()
+    with engine.connect() as conn:
+        rows = conn.execute(
+            sql_text(
+                f"SELECT date, habit_id, done FROM {CUSTOM_HABIT_DONE_TABLE} "
+                "WHERE user_email = :user_email AND date BETWEEN :start_date AND :end_date"
+            ),
+            {"user_email": user_email, "start_date": start_iso, "end_date": end_iso},
+        ).fetchall()
+    payload = {}
+    for row in rows:
+        payload.setdefault(str(row[0])[:10], {})[str(row[1])] = int(bool(row[2]))
+    return payload
 
 
 def get_daily_text(user_email, day):
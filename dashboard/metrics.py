@@ -2,36 +2,7 @@ from __future__ import annotations
 
 from datetime import timedelta
 
-from dashboard.constants import (
-    HABITS,
-    FIXED_COUPLE_HABIT_KEYS,
-    MEETING_HABIT_KEYS,
-    FAMILY_WORSHIP_HABIT_KEYS,
-)
-
-
-def compute_balance_score(row):
-    habits_percent = row.get("habits_percent", 0) or 0
-    work_hours = row.get("work_hours", 0) or 0
-    sleep_hours = row.get("sleep_hours", 0) or 0
-    boredom = row.get("boredom_minutes", 60) or 60
-
-    work_score = min(work_hours, 8) / 8 * 100
-    sleep_score = min(sleep_hours, 8) / 8 * 100
-    if 10 <= boredom <= 40:
-        boredom_score = 100
-    elif boredom < 10:
-        boredom_score = max(0, (boredom / 10) * 100)
-    else:
-        boredom_score = max(0, ((60 - boredom) / 20) * 100)
-
-    score = (
-        habits_percent * 0.35
-        + work_score * 0.25
-        + sleep_score * 0.25
-        + boredom_score * 0.15
-    )
-    return round(score, 1)
+from backend.metrics import compute_balance_score, compute_habits_metrics as _compute_day_habits_metrics
 
 
 def zero_boredom_streak(data, today):
@@ -51,27 +22,12 @@ def zero_boredom_streak(data, today):
 
 
 def compute_habits_metrics(row, meeting_days, family_worship_day, custom_done_by_date, custom_habit_ids):
-    total = 0
-    completed = 0
-    weekday = row["date"].weekday()
-    for key, _ in HABITS:
-        if key not in FIXED_COUPLE_HABIT_KEYS:
-            continue
-        if key in MEETING_HABIT_KEYS and weekday not in meeting_days:
-            continue
-        if key in FAMILY_WORSHIP_HABIT_KEYS and weekday != family_worship_day:
-            continue
-        total += 1
-        completed += int(row.get(key, 0) or 0)
-
-    done_map = custom_done_by_date.get(row["date"], {})
-    for habit_id in custom_habit_ids:
-        total += 1
-        completed += int(bool(done_map.get(habit_id, 0)))
-
-    priority_label = (row.get("priority_label") or "").strip()
-    if priority_label:
-        total += 1
-        completed += int(row.get("priority_done", 0) or 0)
-    percent = round((completed / total) * 100, 1) if total > 0 else 0
-    return completed, percent, total
+    # Same scoring as the API's day snapshots; only the row shape differs.
+    return _compute_day_habits_metrics(
+        row,
+        row["date"],
+        meeting_days,
+        family_worship_day,
+        custom_done_by_date.get(row["date"], {}),
+        custom_habit_ids,
+    )
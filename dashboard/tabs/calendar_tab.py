@@ -2,7 +2,6 @@ import logging
 import json
 import time
 from datetime import date, datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor
 
 import streamlit as st
 
@@ -22,11 +21,6 @@ except Exception:
     st_calendar = None
 
 
-@st.cache_resource
-def _calendar_executor():
-    return ThreadPoolExecutor(max_workers=6)
-
-
 PRIORITY_COLORS = {
     "High": PRIORITY_META["High"]["color"],
     "Medium": PRIORITY_META["Medium"]["color"],
@@ -234,12 +228,9 @@ def _sync_google_if_connected(user_email, connected, start_day, end_day, calenda
         st.session_state["calendar.sync_started"] = time.time()
         st.session_state["calendar.sync_error"] = ""
         if api_client.is_enabled():
-            def _fire_sync():
-                try:
-                    api_client.request("POST", "/v1/calendar/sync/run")
-                except Exception as exc:
-                    logger.warning("Background calendar sync failed: %s", exc)
-            _calendar_executor().submit(_fire_sync)
+            # The backend queues the sync and answers with a job id; the tab polls it on later reruns.
+            job = api_client.request("POST", "/v1/calendar/sync/run") or {}
+            st.session_state["calendar.sync_job_id"] = job.get("job_id")
             st.session_state["calendar.last_sync_key"] = sync_key
             st.session_state["calendar.last_sync_ts"] = now
             return []
@@ -255,6 +246,26 @@ def _sync_google_if_connected(user_email, connected, start_day, end_day, calenda
         return []
 
 
+def _poll_sync_job(job_id):
+    try:
+        job = api_client.request("GET", f"/v1/sync/jobs/{job_id}", timeout=4) or {}
+    except Exception as exc:
+        logger.debug("Failed to poll sync job %s: %s", job_id, exc)
+        return "Syncing"
+    status = job.get("status")
+    if status == "done":
+        st.session_state["calendar.sync_status"] = "Idle"
+        st.session_state["calendar.sync_job_id"] = None
+        st.session_state["calendar.force_refresh"] = True
+        return "Idle"
+    if status == "error":
+        st.session_state["calendar.sync_status"] = "Failed"
+        st.session_state["calendar.sync_error"] = job.get("error") or ""
+        st.session_state["calendar.sync_job_id"] = None
+        return "Failed"
+    return "Syncing"
+
+
 def _sync_created_or_updated_activity_to_google(user_email, activity_id, connected, primary_calendar_id):
     if not connected:
         return
@@ -269,14 +280,16 @@ def _sync_created_or_updated_activity_to_google(user_email, activity_id, connect
                 return
             st.session_state["calendar.sync_status"] = "Syncing"
             st.session_state["calendar.sync_error"] = ""
-            api_client.request("POST", "/v1/sync/run")
+            result = api_client.request("POST", "/v1/sync/run") or {}
             st.session_state["calendar.sync_status"] = "Idle"
             st.session_state["calendar.last_push_sync_ts"] = time.time()
+            # The backend tracks Google throttling per user and says how long to hold off.
+            retry_after = float(result.get("retry_after") or 0)
+            if retry_after > 0:
+                st.session_state["calendar.sync_cooldown_until"] = time.time() + retry_after
         except Exception as exc:
             st.session_state["calendar.sync_status"] = "Failed"
             st.session_state["calendar.sync_error"] = str(exc)
-            if "429" in str(exc):
-                st.session_state["calendar.sync_cooldown_until"] = time.time() + 30
             logger.warning("Calendar sync push failed: %s", exc)
             return
         return
@@ -305,7 +318,10 @@ def render_calendar_tab(ctx):
     sync_error = st.session_state.get("calendar.sync_error", "")
     sync_started = st.session_state.get("calendar.sync_started")
     cooldown_until = float(st.session_state.get("calendar.sync_cooldown_until", 0.0) or 0.0)
-    if sync_status == "Syncing" and sync_started:
+    sync_job_id = st.session_state.get("calendar.sync_job_id")
+    if sync_status == "Syncing" and sync_job_id and api_client.is_enabled():
+        sync_status = _poll_sync_job(sync_job_id)
+    elif sync_status == "Syncing" and sync_started:
         try:
             if time.time() - float(sync_started) > 8:
                 st.session_state["calendar.sync_status"] = "Idle"
@@ -3,7 +3,7 @@ from datetime import date, timedelta
 import streamlit as st
 
 from dashboard.visualizations import dot_chart
-from dashboard.data.loaders import load_data, load_custom_habit_done_by_date
+from dashboard.data.loaders import load_data, load_custom_habit_done_by_date, load_day_snapshots
 from dashboard.data import repositories
 from dashboard.metrics import compute_habits_metrics, compute_balance_score
 
@@ -22,27 +22,36 @@ def render_stats_tab(ctx):
         st.info("No persisted data yet.")
         return
 
-    custom_habits = repositories.get_custom_habits(ctx.get("current_user_email"), active_only=True)
-    custom_habit_ids = [habit["id"] for habit in custom_habits]
     start_bound = data["date"].min() if not data.empty else today
     end_bound = data["date"].max() if not data.empty else today
-    custom_done_by_date = load_custom_habit_done_by_date(start_bound, end_bound)
-    metrics = data.apply(
-        lambda row: compute_habits_metrics(
-            row,
-            ctx.get("meeting_days", []),
-            ctx.get("family_worship_day", 6),
-            custom_done_by_date,
-            custom_habit_ids,
-        ),
-        axis=1,
-        result_type="expand",
-    )
+    snapshots = load_day_snapshots(start_bound, end_bound) if api_enabled else {}
     data = data.copy()
-    data["habits_completed"] = metrics[0]
-    data["habits_percent"] = metrics[1]
-    data["habits_total"] = metrics[2]
-    data["life_balance_score"] = data.apply(compute_balance_score, axis=1)
+    if snapshots:
+        data["habits_completed"] = data["date"].map(lambda d: int(snapshots.get(d, {}).get("habits_completed", 0) or 0))
+        data["habits_percent"] = data["date"].map(lambda d: float(snapshots.get(d, {}).get("habits_percent", 0) or 0))
+        data["habits_total"] = data["date"].map(lambda d: int(snapshots.get(d, {}).get("habits_total", 0) or 0))
+        data["life_balance_score"] = data["date"].map(
+            lambda d: float(snapshots.get(d, {}).get("life_balance_score", 0) or 0)
+        )
+    else:
+        custom_habits = repositories.get_custom_habits(ctx.get("current_user_email"), active_only=True)
+        custom_habit_ids = [habit["id"] for habit in custom_habits]
+        custom_done_by_date = load_custom_habit_done_by_date(start_bound, end_bound)
+        metrics = data.apply(
+            lambda row: compute_habits_metrics(
+                row,
+                ctx.get("meeting_days", []),
+                ctx.get("family_worship_day", 6),
+                custom_done_by_date,
+                custom_habit_ids,
+            ),
+            axis=1,
+            result_type="expand",
+        )
+        data["habits_completed"] = metrics[0]
+        data["habits_percent"] = metrics[1]
+        data["habits_total"] = metrics[2]
+        data["life_balance_score"] = data.apply(compute_balance_score, axis=1)
     data["weekday"] = data["date"].apply(lambda d: d.weekday())
     data["is_weekend"] = data["weekday"] >= 5
 
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+
+from backend import repositories, settings
+from backend.services import google_calendar_service
+
+BATCH_URL = "https://batch.test/calendar/v3"
+
+
+def _operation(op_id: str, method: str = "POST", event_id: str | None = None) -> dict:
+    return {
+        "id": op_id,
+        "method": method,
+        "path": google_calendar_service.event_path("primary", event_id),
+        "body": {"summary": op_id} if method != "DELETE" else None,
+    }
+
+
+def _batch_response(parts: list[tuple[int, int, dict | None]], reverse: bool = False) -> httpx.Response:
+    """Build a multipart/mixed reply from (content index, status, json body) tuples."""
+    boundary = "batch_reply"
+    chunks = []
+    for index, status, body in reversed(parts) if reverse else parts:
+        payload = json.dumps(body) if body is not None else ""
+        chunks.append(
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <response-item-{index}>\r\n\r\n"
+            f"HTTP/1.1 {status} X\r\n"
+            "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+            f"{payload}\r\n"
+        )
+    content = "".join(chunks) + f"--{boundary}--\r\n"
+    return httpx.Response(
+        200, headers={"Content-Type": f"multipart/mixed; boundary={boundary}"}, content=content.encode()
+    )
+
+
+def _request_items(request: httpx.Request) -> list[tuple[int, str]]:
+    """(content index, request line) for each part of an outgoing batch."""
+    text = request.content.decode()
+    return [
+        (int(index), line)
+        for index, line in re.findall(r"Content-ID: <item-(\d+)>\r\n\r\n([^\r\n]+)", text)
+    ]
+
+
+@pytest.fixture
+def google(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    monkeypatch.setenv("GOOGLE_TOKEN_ENCRYPTION_KEY", "test")
+    monkeypatch.setenv("BACKEND_SESSION_SECRET", "test")
+    monkeypatch.setattr(settings, "_settings", None)
+
+    async def _quota_used(user_email, day):
+        return 0
+
+    async def _add_quota(user_email, day, count):
+        return None
+
+    async def _headers(user_email):
+        return {"Authorization": "Bearer test"}
+
+    monkeypatch.setattr(repositories, "get_google_quota_usage", _quota_used)
+    monkeypatch.setattr(repositories, "add_google_quota_usage", _add_quota)
+    monkeypatch.setattr(google_calendar_service, "_google_headers", _headers)
+    for state in ("_BLOCKED_UNTIL", "_RATE_LIMIT_STRIKES", "_BUCKETS", "_QUOTA_USAGE"):
+        monkeypatch.setattr(google_calendar_service, state, {})
+    google_calendar_service.CALENDAR_BREAKER.record_success()
+
+    requests: list[httpx.Request] = []
+
+    def _install(handler):
+        def _record(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return handler(request, len(requests))
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(_record))
+        monkeypatch.setattr(google_calendar_service, "get_http_client", lambda: client)
+        return requests
+
+    yield _install
+    google_calendar_service.CALENDAR_BREAKER.record_success()
+
+
+def test_sub_responses_map_back_by_content_id(google):
+    def handler(request, call):
+        assert str(request.url) == BATCH_URL
+        statuses = {"POST": (200, {"id": "evt-1"}), "PATCH": (404, {"error": {"message": "Not Found"}})}
+        parts = []
+        for index, line in _request_items(request):
+            method = line.split()[0]
+            if method == "DELETE":
+                parts.append((index, 429, {"error": {"errors": [{"reason": "rateLimitExceeded"}]}}))
+            else:
+                parts.append((index, *statuses[method]))
+        # Google does not promise to answer in request order.
+        return _batch_response(parts, reverse=True)
+
+    google(handler)
+    operations = [
+        _operation("create"),
+        _operation("update", "PATCH", "evt-2"),
+        _operation("delete", "DELETE", "evt-3"),
+    ]
+    results = asyncio.run(google_calendar_service.execute_batch("a@x.com", operations, batch_url=BATCH_URL))
+
+    assert results["create"]["status_code"] == 200
+    assert results["create"]["body"] == {"id": "evt-1"}
+    assert results["create"]["error"] is None
+    assert results["update"]["status_code"] == 404
+    assert "Not Found" in results["update"]["error"]
+    assert "retry_after" not in results["update"]
+    assert results["delete"]["status_code"] == 429
+    assert results["delete"]["retry_after"] > 0
+
+
+def test_failed_chunk_keeps_results_of_earlier_chunks(google, monkeypatch):
+    monkeypatch.setattr(google_calendar_service, "BATCH_MAX_OPERATIONS", 2)
+
+    def handler(request, call):
+        if call == 2:
+            return httpx.Response(503, text="backend error")
+        return _batch_response([(index, 200, {"id": f"evt-{call}-{index}"}) for index, _ in _request_items(request)])
+
+    requests = google(handler)
+    operations = [_operation(f"op-{index}") for index in range(5)]
+    results = asyncio.run(google_calendar_service.execute_batch("a@x.com", operations, batch_url=BATCH_URL))
+
+    assert len(requests) == 3
+    assert [results[f"op-{index}"]["body"]["id"] for index in (0, 1)] == ["evt-1-0", "evt-1-1"]
+    assert all(results[f"op-{index}"]["error"] is None for index in (0, 1, 4))
+    for index in (2, 3):
+        assert results[f"op-{index}"]["status_code"] == 503
+        assert results[f"op-{index}"]["error"]
+        assert "retry_after" not in results[f"op-{index}"]
+
+
+def test_rate_limited_chunk_fails_without_discarding_applied_creates(google, monkeypatch):
+    monkeypatch.setattr(google_calendar_service, "BATCH_MAX_OPERATIONS", 2)
+
+    def handler(request, call):
+        if call == 2:
+            return httpx.Response(429, headers={"Retry-After": "12"}, json={"error": {"message": "slow down"}})
+        return _batch_response([(index, 200, {"id": f"evt-{index}"}) for index, _ in _request_items(request)])
+
+    requests = google(handler)
+    operations = [_operation(f"op-{index}") for index in range(5)]
+    results = asyncio.run(google_calendar_service.execute_batch("a@x.com", operations, batch_url=BATCH_URL))
+
+    # The user is blocked after the 429, so the last chunk fails locally without another request.
+    assert len(requests) == 2
+    assert results["op-0"]["error"] is None and results["op-1"]["error"] is None
+    for index in (2, 3, 4):
+        assert results[f"op-{index}"]["error"]
+        assert results[f"op-{index}"]["retry_after"] > 0
+
+
+def test_throttled_parts_count_as_one_strike(google):
+    def handler(request, call):
+        return _batch_response(
+            [
+                (index, 429, {"error": {"errors": [{"reason": "rateLimitExceeded"}]}})
+                for index, _ in _request_items(request)
+            ]
+        )
+
+    google(handler)
+    operations = [_operation(f"op-{index}") for index in range(8)]
+    results = asyncio.run(google_calendar_service.execute_batch("a@x.com", operations, batch_url=BATCH_URL))
+
+    assert google_calendar_service._RATE_LIMIT_STRIKES["a@x.com"] == 1
+    assert {result["retry_after"] for result in results.values()} == {
+        google_calendar_service.RATE_LIMIT_DEFAULT_BACKOFF_SECONDS
+    }
+
+
+def test_concurrent_first_quota_reads_share_one_entry(google, monkeypatch):
+    loads = []
+
+    async def _slow_quota_used(user_email, day):
+        loads.append(day)
+        await asyncio.sleep(0.01)
+        return 7
+
+    monkeypatch.setattr(repositories, "get_google_quota_usage", _slow_quota_used)
+
+    async def _record_concurrently():
+        await asyncio.gather(*(google_calendar_service._record_quota_usage("a@x.com", 1) for _ in range(5)))
+        return await google_calendar_service._quota_entry("a@x.com")
+
+    entry = asyncio.run(_record_concurrently())
+    assert len(loads) == 1
+    assert entry["used"] == 12
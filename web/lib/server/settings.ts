@@ -163,21 +163,14 @@ function normalizeCustomHabits(
 }
 
 export async function getCustomHabitDone(userEmail: string, dayIso: string) {
-  const raw = await getSetting(userEmail, `custom_habit_done::${dayIso}`);
-  if (!raw) return {} as Record<string, number>;
-  try {
-    const parsed = JSON.parse(raw);
-    if (parsed && typeof parsed === "object") {
-      const clean: Record<string, number> = {};
-      Object.entries(parsed).forEach(([key, value]) => {
-        clean[String(key)] = value ? 1 : 0;
-      });
-      return clean;
-    }
-  } catch (_err) {
-    return {};
-  }
-  return {} as Record<string, number>;
+  const rows = await prisma.customHabitDone.findMany({
+    where: { userEmail, date: dayIso },
+  });
+  const clean: Record<string, number> = {};
+  rows.forEach((row) => {
+    clean[String(row.habitId)] = row.done ? 1 : 0;
+  });
+  return clean;
 }
 
 export async function setCustomHabitDone(
@@ -185,15 +178,19 @@ export async function setCustomHabitDone(
   dayIso: string,
   done: Record<string, number>
 ) {
-  const clean: Record<string, number> = {};
-  Object.entries(done || {}).forEach(([key, value]) => {
-    clean[String(key)] = value ? 1 : 0;
-  });
-  await setSetting(
+  const nowIso = new Date().toISOString();
+  const rows = Object.entries(done || {}).map(([key, value]) => ({
     userEmail,
-    `custom_habit_done::${dayIso}`,
-    JSON.stringify(clean)
-  );
+    date: dayIso,
+    habitId: String(key),
+    done: value ? 1 : 0,
+    updatedAt: nowIso,
+  }));
+  // Same table the API writes; the per-day map replaces whatever was stored for that day.
+  await prisma.$transaction([
+    prisma.customHabitDone.deleteMany({ where: { userEmail, date: dayIso } }),
+    prisma.customHabitDone.createMany({ data: rows }),
+  ]);
 }
 
 export async function listCustomHabitDoneRange(
@@ -201,31 +198,14 @@ export async function listCustomHabitDoneRange(
   startIso: string,
   endIso: string
 ) {
-  const prefix = `${userEmail}::custom_habit_done::`;
-  const rows = await prisma.setting.findMany({
-    where: {
-      key: {
-        startsWith: prefix,
-      },
-    },
+  const rows = await prisma.customHabitDone.findMany({
+    where: { userEmail, date: { gte: startIso, lte: endIso } },
   });
   const payload: Record<string, Record<string, number>> = {};
   rows.forEach((row) => {
-    const datePart = row.key.replace(prefix, "");
-    if (!datePart) return;
-    if (datePart < startIso || datePart > endIso) return;
-    try {
-      const parsed = JSON.parse(row.value || "{}");
-      if (parsed && typeof parsed === "object") {
-        const clean: Record<string, number> = {};
-        Object.entries(parsed).forEach(([key, value]) => {
-          clean[String(key)] = value ? 1 : 0;
-        });
-        payload[datePart] = clean;
-      }
-    } catch (_err) {
-      return;
-    }
+    const datePart = String(row.date).slice(0, 10);
+    if (!payload[datePart]) payload[datePart] = {};
+    payload[datePart][String(row.habitId)] = row.done ? 1 : 0;
   });
   return payload;
 }